@@ -0,0 +1,22 @@
+/* This code is part of Schroedinger Newton Inhibitions of Dispersion
+   (C) Copyright Andre Grossardt 2010-2023
+   https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+   
+   This code is licensed under the MIT License (see LICENSE.txt for details)
+ */
+
+/* Physical constants used by the integrators */
+
+#ifndef MODULE_CONSTANTS_H
+#define MODULE_CONSTANTS_H
+/* Define some constants for relevant pre-factors
+ * These numbers are in SI units whereas parameters are given in
+ * atomic mass units (u), nanometers (nm), and nanoseconds (ns).
+ */
+/* pi * G / hbar * (1u in kg)^2 */
+#define PIGOHBAR 5.4824699260461014e-30L
+/* -hbar / 8 * 10^9 / (1u in kg) */
+#define MHBAROEI -7.9384748449675167L
+/* pi in long double precision */
+#define M_PIl 3.141592653589793238462643383279502884L
+#endif /* MODULE_CONSTANTS_H */
@@ -0,0 +1,127 @@
+/* This code is part of Schroedinger Newton Inhibitions of Dispersion
+   (C) Copyright Andre Grossardt 2010-2023
+   https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+   
+   This code is licensed under the MIT License (see LICENSE.txt for details)
+ */
+
+/* 
+ * This file contains the discrete sine transform used by the split-step
+ * integrator, computed with a mixed radix FFT of length 2N.
+ * The FFT is fastest if N has only small prime factors.
+ */
+
+/* Includes */
+#include <complex.h>
+#include <math.h>
+
+/* Parameters for the run are in param.h */
+#include "param.h"
+/* Physical constants */
+#include "constants.h"
+
+/* FFT length */
+#define L ( 2 * N )
+
+/* twiddle factors exp(-2 pi i j / L), set in dst_init */
+static long double complex tw[L];
+
+
+/* Initialise twiddle factors */
+void dst_init ( void )
+{
+    long double arg;
+    int j;
+    
+    for ( j=0; j<L; ++j )
+    {
+        arg = -2.0L * M_PIl * (long double) j / (long double) L;
+        tw[j] = cosl ( arg ) + I * sinl ( arg );
+    }
+}
+
+/* Recursive mixed radix FFT (decimation in time) of length n
+ * out[k] = sum_j in[j * stride] exp(-2 pi i j k / n)
+ * with n * tws = L, such that exp(-2 pi i / n) = tw[tws].
+ */
+static void fft ( const long double complex *in, long double complex *out, int n, int stride, int tws )
+{
+    long double complex sum;
+    int p, m, r, k, q, e;
+    
+    if ( n == 1 )
+    {
+        out[0] = in[0];
+        return;
+    }
+    /* smallest prime factor p of n */
+    for ( p=2; n % p; ++p )
+    {
+        if ( p * p > n )
+        {
+            p = n;
+            break;
+        }
+    }
+    m = n / p;
+    /* p transforms of length m */
+    for ( r=0; r<p; ++r )
+    {
+        fft ( in + r * stride, out + r * m, m, stride * p, tws * p );
+    }
+    /* combine with radix p butterflies */
+    {
+        long double complex tmp[p];
+        for ( k=0; k<m; ++k )
+        {
+            for ( r=0; r<p; ++r )
+            {
+                tmp[r] = out[r * m + k];
+            }
+            for ( q=0; q<p; ++q )
+            {
+                /* e = r (k + q m) mod n */
+                sum = tmp[0];
+                e = 0;
+                for ( r=1; r<p; ++r )
+                {
+                    e += k + q * m;
+                    if ( e >= n )
+                    {
+                        e -= n;
+                    }
+                    sum += tmp[r] * tw[e * tws];
+                }
+                out[k + q * m] = sum;
+            }
+        }
+    }
+}
+
+/* In-place discrete sine transform (DST-I) of u[1..N-1]
+ *   U_k = sum_{j=1}^{N-1} u_j sin(pi j k / N)
+ * u[0] is ignored and set to 0. Applying the transform twice yields
+ * N/2 times the original values.
+ */
+void dst ( long double complex u[N] )
+{
+    long double complex y[L];
+    long double complex z[L];
+    int j;
+    
+    /* odd extension of u, y_{2N-j} = -u_j */
+    y[0] = 0.0L;
+    y[N] = 0.0L;
+    for ( j=1; j<N; ++j )
+    {
+        y[j] = u[j];
+        y[L - j] = -u[j];
+    }
+    fft ( y, z, L, 1, 1 );
+    /* z_k = -2 i U_k */
+    u[0] = 0.0L;
+    for ( j=1; j<N; ++j )
+    {
+        u[j] = 0.5L * I * z[j];
+    }
+}
@@ -0,0 +1,15 @@
+/* This code is part of Schroedinger Newton Inhibitions of Dispersion
+   (C) Copyright Andre Grossardt 2010-2023
+   https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+   
+   This code is licensed under the MIT License (see LICENSE.txt for details)
+ */
+
+/* Header file for dst.c */
+
+#ifndef MODULE_DST_H
+#define MODULE_DST_H
+#include "param.h"
+void dst_init ( void );
+void dst ( long double complex u[N] );
+#endif /* MODULE_DST_H */
@@ -0,0 +1,44 @@
+/* This code is part of Schroedinger Newton Inhibitions of Dispersion
+   (C) Copyright Andre Grossardt 2010-2023
+   https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+   
+   This code is licensed under the MIT License (see LICENSE.txt for details)
+ */
+
+/* 
+ * This file contains the definition of the radial grid.
+ */
+
+/* Includes */
+#include <math.h>
+
+/* Parameters for the run are in param.h */
+#include "param.h"
+
+/* Radius of grid point j in nm
+ * Uniform grid r_j = j dr for GRIDSTRETCH = 0, otherwise the mapped grid
+ * r_j = s dr sinh(j/s) with s = GRIDSTRETCH, which has spacing dr at the
+ * origin growing exponentially for j >> s.
+ * Also defined for j = N (outer boundary where psi vanishes).
+ */
+long double grid_r ( int j )
+{
+    #if GRIDSTRETCH > 0
+    static const long double s = (long double) GRIDSTRETCH;
+    return ( s * DR * sinhl ( (long double) j / s ) );
+    #else
+    return ( (long double) j * DR );
+    #endif /* GRIDSTRETCH */
+}
+
+/* Quadrature weight of grid point j in nm, i.e. (r_{j+1} - r_{j-1}) / 2
+ * such that int f(r) dr = sum_j f(r_j) grid_weight(j)
+ */
+long double grid_weight ( int j )
+{
+    if ( j == 0 )
+    {
+        return ( 0.5L * grid_r ( 1 ) );
+    }
+    return ( 0.5L * ( grid_r ( j+1 ) - grid_r ( j-1 ) ) );
+}
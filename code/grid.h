@@ -0,0 +1,15 @@
+/* This code is part of Schroedinger Newton Inhibitions of Dispersion
+   (C) Copyright Andre Grossardt 2010-2023
+   https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+   
+   This code is licensed under the MIT License (see LICENSE.txt for details)
+ */
+
+/* Header file for grid.c */
+
+#ifndef MODULE_GRID_H
+#define MODULE_GRID_H
+#include "param.h"
+long double grid_r ( int j );
+long double grid_weight ( int j );
+#endif /* MODULE_GRID_H */
@@ -18,16 +18,21 @@
 #include <fcntl.h>
 #include <string.h>
 #include <dirent.h>
+#include <limits.h>
 #include <sys/stat.h>
 #include <unistd.h>
 
 
 /* Parameters for the run are in param.h */
 #include "param.h"
+/* Radial grid */
+#include "grid.h"
+/* Optional timers and counters */
+#include "profile.h"
 
 
 /* Build path name */
-void outpath_name ( char opath[238], const char *path, const char timestr[14] )
+void outpath_name ( char opath[238], const char *path, const char *timestr )
 {
     char first[222];
     size_t len;
@@ -35,16 +40,18 @@ void outpath_name ( char opath[238], const char *path, const char timestr[14] )
     strncpy ( first, path, sizeof( first ) );
     len = strlen ( first );
     /* cut final / */
-    if ( opath[len - 1] == '/' )
+    if ( len > 0 && first[len - 1] == '/' )
     {
-        opath[len - 1] = '\0';
+        first[len - 1] = '\0';
     }
     /* append timestring */
-    sprintf ( opath, "%s/%s", first, timestr );
+    snprintf ( opath, 238, "%s/%s", first, timestr );
 }
 
-/* Create path for output */
-void make_outpath ( char opath[238], const char *path )
+/* Create path for output
+ * The subpath is given by date and time if subpath is NULL.
+ */
+void make_outpath ( char opath[238], const char *path, const char *subpath )
 {
     char *p;
     char timestr[14];
@@ -53,18 +60,30 @@ void make_outpath ( char opath[238], const char *path )
     time_t rawtime;
     int i = 0;
     
-    /* get date and time */
-    time ( &rawtime );
-    strftime ( timestr, 14, "%Y%m%d-%H%M", localtime ( &rawtime ) );
-    /* append date and time to path */
-    outpath_name( opath, path, timestr );
+    if ( subpath != NULL )
+    {
+        /* fixed subpath, e.g. from a parameter sweep */
+        outpath_name( opath, path, subpath );
+        if ( ! access ( opath, F_OK ) )
+        {
+            printf ( "Error: Directory %s exists. Quitting.\n", opath );
+            exit( 0 );
+        }
+    }
+    else
+    {
+        /* get date and time */
+        time ( &rawtime );
+        strftime ( timestr, 14, "%Y%m%d-%H%M", localtime ( &rawtime ) );
+        /* append date and time to path */
+        outpath_name( opath, path, timestr );
+    }
     len = strlen ( opath );
     /* make sure that two instances of the program will not use the same path */
     while ( ! access ( opath, F_OK ) ) /* as long as directory exists */
     {
         /* append number to path */
-        opath[len] = '\0';
-        sprintf ( opath, "%s-%1d", opath, ++i );
+        sprintf ( opath + len, "-%1d", ++i );
         if ( i>9 )
         {
             printf ( "Error: Too many identical directory names. Quitting." );
@@ -99,7 +118,7 @@ void make_outpath ( char opath[238], const char *path )
 }
 
 /* Write the parameters to param.txt */
-void save_settings( const char *path, unsigned long t )
+void save_settings( const char *path, unsigned long t, const char *scheme )
 {
     FILE *fp;
     char filename[256];
@@ -126,11 +145,21 @@ void save_settings( const char *path, unsigned long t )
         fprintf ( fp, "mass in u  : %20Lg\n", M );
         fprintf ( fp, "grid size  : %20d\n",  N );
         fprintf ( fp, "dr in nm   : %20Lg\n", DR );
+        fprintf ( fp, "stretching : %20d\n", GRIDSTRETCH );
+        fprintf ( fp, "grid radius: %20Lg\n", grid_r ( N-1 ) );
         fprintf ( fp, "dt in ns   : %20Lg\n", DT );
         fprintf ( fp, "max. time  : %20lu\n", MAXT );
         fprintf ( fp, "save every : %20lu\n", SAVEEVERY );
+        fprintf ( fp, "scheme     : %20s\n", scheme );
+        fprintf ( fp, "integrator : %20c\n", INTEGRATOR );
+        fprintf ( fp, "adaptive dt: %20d\n", ADAPTIVE );
+        if ( ADAPTIVE )
+            fprintf ( fp, "tolerance  : %20Lg\n", TOL );
         fprintf ( fp, "coupling   : %20Lg\n", COUP );
         fprintf ( fp, "wave funct.: %20c\n",  WAVEFUNCT );
+        fprintf ( fp, "abs. layer : %20d\n",  CAPWIDTH );
+        if ( CAPWIDTH > 0 )
+            fprintf ( fp, "abs. rate  : %20Lg\n", CAPRATE );
         if ( WAVEFUNCT == 'g' )
             fprintf ( fp, "movie cmd  : python movie.py %s %d %lu %lu \"%5Lg u, %Lg s\" %Lg %Lg %Lg %Lg\n", path, N, MAXT, SAVEEVERY, M, totaltime, W, M, DR, DT );
         else
@@ -152,6 +181,11 @@ static FILE *open_wf_file ( int write, unsigned long t, const char *path )
     
     strcpy ( rwmode, write ? "wb" : "rb");
     sprintf ( filename, "%s/data/w%014lu.dat" , path, t );
+    if ( write )
+    {
+        /* do not write through a link to the data of a parent run */
+        unlink ( filename );
+    }
     if ( ( fp = fopen ( filename, rwmode ) ) == NULL )
     {
         printf ( "Cannot open file. Quitting.\n" );
@@ -171,6 +205,80 @@ void save_wf ( unsigned long t, long double complex psi[N], const char *path )
         exit( 0 );
     }
     fclose ( fp );
+    PROFILE_BYTES ( N * sizeof ( long double complex ) );
+}
+
+/* Save the radial grid r_j in nm to grid.dat */
+void save_grid ( const char *path )
+{
+    FILE *fp;
+    char filename[256];
+    long double r[N];
+    int i;
+    
+    for ( i=0; i<N; ++i )
+    {
+        r[i] = grid_r ( i );
+    }
+    sprintf ( filename, "%s/grid.dat" , path );
+    if ( ( fp = fopen ( filename, "wb" ) ) == NULL )
+    {
+        printf ( "Cannot open file. Quitting.\n" );
+        exit( 0 );
+    }
+    if ( fwrite ( r, sizeof ( long double ), N, fp ) != N )
+    {
+        printf ( "File write error. Quitting.\n" );
+        exit( 0 );
+    }
+    fclose ( fp );
+}
+
+/* Append the norm 4 pi int |psi|^2 r^2 dr to norm.dat
+ * Keeps track of the probability removed by the absorbing layer.
+ */
+void save_norm ( unsigned long t, long double complex psi[N], const char *path )
+{
+    FILE *fp;
+    char filename[256];
+    long double psisq;
+    long double r;
+    long double sum = 0.0L;
+    int i;
+    
+    for ( i=1; i<N; ++i )
+    {
+        r = grid_r ( i );
+        psisq = cabsl ( psi[i] );
+        sum += psisq * psisq * r * r * grid_weight ( i );
+    }
+    sum *= 4.0L * M_PI;
+    sprintf ( filename, "%s/norm.dat" , path );
+    if ( ( fp = fopen ( filename, "a" ) ) == NULL )
+    {
+        printf ( "Cannot open file. Quitting.\n" );
+        exit( 0 );
+    }
+    fprintf ( fp, "%lu\t%.18Le\n", t, sum );
+    fclose ( fp );
+}
+
+/* Append the physical time of a saved step to times.dat
+ * Columns: file label t, time in ns, number of steps taken, current dt in ns
+ */
+void save_time ( unsigned long t, unsigned long steps, long double dt, const char *path )
+{
+    FILE *fp;
+    char filename[256];
+    
+    sprintf ( filename, "%s/times.dat" , path );
+    if ( ( fp = fopen ( filename, "a" ) ) == NULL )
+    {
+        printf ( "Cannot open file. Quitting.\n" );
+        exit( 0 );
+    }
+    fprintf ( fp, "%lu\t%.18Le\t%lu\t%.18Le\n", t, DT * (long double) t, steps, dt );
+    fclose ( fp );
 }
 
 /* Load wave function */
@@ -194,6 +302,135 @@ void load_wf ( unsigned long t, long double complex psi[N], const char *path )
     fclose ( fp );
 }
 
+/* Copy the lines of a text file of the parent run up to time step t
+ * (first column) to the output directory
+ */
+static void copy_lines ( const char *parent, const char *path, const char *name, unsigned long t )
+{
+    FILE *in;
+    FILE *out;
+    char filename[PATH_MAX + 32];
+    char line[256];
+    
+    snprintf ( filename, sizeof ( filename ), "%s/%s", parent, name );
+    if ( ( in = fopen ( filename, "r" ) ) == NULL )
+    {
+        /* runs of older versions do not have all files */
+        return;
+    }
+    snprintf ( filename, sizeof ( filename ), "%s/%s", path, name );
+    if ( ( out = fopen ( filename, "w" ) ) == NULL )
+    {
+        printf ( "Cannot open file. Quitting.\n" );
+        exit( 0 );
+    }
+    while ( fgets ( line, sizeof ( line ), in ) != NULL )
+    {
+        if ( strtoul ( line, NULL, 10 ) <= t )
+        {
+            fputs ( line, out );
+        }
+    }
+    fclose ( in );
+    fclose ( out );
+}
+
+/* Start a new run from time step t of the parent run in a new directory
+ * The saved wave functions of the parent up to t are linked, not copied.
+ * arguments: opath (output path), parent (path of the parent run),
+ *            t, subpath (NULL for date and time), psi
+ */
+void fork_run ( char opath[238], const char *parent, unsigned long t, const char *subpath, long double complex psi[N] )
+{
+    FILE *fp;
+    DIR *dir;
+    struct dirent *entry;
+    struct stat st;
+    char ppath[PATH_MAX];
+    char filename[PATH_MAX + 32];
+    char target[PATH_MAX + 288];
+    unsigned long label;
+    long double r;
+    int j;
+    
+    if ( realpath ( parent, ppath ) == NULL )
+    {
+        printf ( "Error: Directory %s not found. Quitting.\n", parent );
+        exit( 0 );
+    }
+    /* the parent must use the same grid */
+    snprintf ( filename, sizeof ( filename ), "%s/data/w%014lu.dat" , ppath, t );
+    if ( stat ( filename, &st ) || st.st_size != N * sizeof ( long double complex ) )
+    {
+        printf ( "Error: No wave function with %d grid points for t=%lu in %s. Quitting.\n", N, t, ppath );
+        exit( 0 );
+    }
+    snprintf ( filename, sizeof ( filename ), "%s/grid.dat" , ppath );
+    if ( ( fp = fopen ( filename, "rb" ) ) != NULL )
+    {
+        for ( j=0; j<N; ++j )
+        {
+            if ( fread ( &r, sizeof ( long double ), 1, fp ) != 1 || fabsl ( r - grid_r ( j ) ) > 1.0e-12L * grid_r ( N-1 ) )
+            {
+                printf ( "Error: Grid of %s differs. Quitting.\n", ppath );
+                exit( 0 );
+            }
+        }
+        fclose ( fp );
+    }
+    /* times.dat stores DT * t, so the parent must use the same DT */
+    snprintf ( filename, sizeof ( filename ), "%s/times.dat" , ppath );
+    if ( ( fp = fopen ( filename, "r" ) ) != NULL )
+    {
+        while ( fgets ( target, sizeof ( target ), fp ) != NULL )
+        {
+            if ( sscanf ( target, "%lu %Le", &label, &r ) == 2 && label == t && fabsl ( r - DT * (long double) t ) > 1.0e-12L * r )
+            {
+                printf ( "Error: Time %Lg ns of t=%lu in %s differs from DT * t = %Lg ns. Quitting.\n", r, t, ppath, DT * (long double) t );
+                exit( 0 );
+            }
+        }
+        fclose ( fp );
+    }
+    load_wf ( t, psi, ppath );
+    
+    make_outpath ( opath, OUTDIR, subpath );
+    save_grid ( opath );
+    /* link the saved wave functions up to t */
+    snprintf ( filename, sizeof ( filename ), "%s/data" , ppath );
+    if ( ( dir = opendir ( filename ) ) == NULL )
+    {
+        printf ( "Cannot open directory. Quitting.\n" );
+        exit( 0 );
+    }
+    while ( ( entry = readdir ( dir ) ) != NULL )
+    {
+        if ( entry->d_name[0] != 'w' || strtoul ( entry->d_name + 1, NULL, 10 ) > t )
+        {
+            continue;
+        }
+        snprintf ( target, sizeof ( target ), "%s/data/%s" , ppath, entry->d_name );
+        snprintf ( filename, sizeof ( filename ), "%s/data/%s" , opath, entry->d_name );
+        if ( symlink ( target, filename ) )
+        {
+            printf ( "Error: Cannot link %s. Quitting.\n", target );
+            exit( 0 );
+        }
+    }
+    closedir ( dir );
+    copy_lines ( ppath, opath, "times.dat", t );
+    copy_lines ( ppath, opath, "norm.dat", t );
+    
+    snprintf ( filename, sizeof ( filename ), "%s/param.txt" , opath );
+    if ( ( fp = fopen ( filename, "a" ) ) == NULL )
+    {
+        printf ( "Cannot open file. Quitting.\n" );
+        exit( 0 );
+    }
+    fprintf ( fp, "forked from %s at t = %lu\n\n", ppath, t );
+    fclose ( fp );
+}
+
 /* Show progress */
 void progress ( unsigned long t )
 {
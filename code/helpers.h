@@ -10,10 +10,15 @@
 #ifndef MODULE_HELPERS_H
 #define MODULE_HELPERS_H
 #include "param.h"
-void make_outpath ( char opath[256], const char *path );
-void save_settings( const char *path, unsigned long t );
+void outpath_name ( char opath[238], const char *path, const char *timestr );
+void make_outpath ( char opath[238], const char *path, const char *subpath );
+void save_settings( const char *path, unsigned long t, const char *scheme );
 void save_wf ( unsigned long t, long double complex psi[N], const char *path );
+void save_grid ( const char *path );
+void save_norm ( unsigned long t, long double complex psi[N], const char *path );
+void save_time ( unsigned long t, unsigned long steps, long double dt, const char *path );
 void load_wf ( unsigned long t, long double complex psi[N], const char *path );
+void fork_run ( char opath[238], const char *parent, unsigned long t, const char *subpath, long double complex psi[N] );
 void progress ( unsigned long t );
 void cont_notify ( unsigned long t, const char *path );
 #endif /* MODULE_HELPERS_H */
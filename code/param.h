@@ -7,20 +7,90 @@
 
 /* Parameter file
    All parameters are defined here
+   Each parameter can also be set at compile time, e.g. gcc -DN=1000 ...,
+   which is used by the Python scripts for benchmarks and parameter sweeps.
  */
 
+#ifndef W
 #define W           500.0L          // width in nm (long double)
+#endif
+#ifndef M
 #define M           50.0e9L         // mass in u (long double)
+#endif
+#ifndef N
 #define N           5100            // grid size (int)
+#endif
+#ifndef DR
 #define DR          0.6L            // dr in nm (long double)
+#endif
+#ifndef GRIDSTRETCH
+#define GRIDSTRETCH 0               // grid stretching in grid points (int), 0 = uniform grid
+#endif
+#ifndef DT
 #define DT          1000000.0L      // dt in ns (long double)
+#endif
+#ifndef MAXT
 #define MAXT        20000000UL      // number of time steps (unsigned long)
+#endif
+#ifndef COUP
 #define COUP        1.0L            // coupling constant for potential (long double)
+#endif
+#ifndef SAVEEVERY
 #define SAVEEVERY   1000UL          // save every X time steps (long double)
+#endif
+#ifndef INTEGRATOR
+#define INTEGRATOR  'l'             // time integrator (char):
+                                    //   'l' = potential of psi^n, first order (default)
+                                    //   'p' = predictor-corrector, second order
+#endif
+#ifndef ADAPTIVE
+#define ADAPTIVE    0               // adaptive time step (int): 0 = off (fixed DT), 1 = on
+#endif
+#ifndef TOL
+#define TOL         1.0e-8L         // tolerance for the relative local error per time step (long double)
+#endif
+#ifndef OUTDIR
 #define OUTDIR      "/tmp/test"     // directory for output (string)
+#endif
+#ifndef WAVEFUNCT
 #define WAVEFUNCT   'g'             // initial wave function type (char):
                                     //   'g' = gaussian (default)
                                     //   'r' = rectangular
                                     //   'e' = exponential with hole in the middle
+#endif
+#ifndef CAPWIDTH
+#define CAPWIDTH    0               // absorbing layer at the outer boundary in grid points (int), 0 = off
+#endif
+#ifndef CAPRATE
+#define CAPRATE     1.0e-12L        // absorption rate at the boundary in 1/ns (long double)
+#endif
+#ifndef RELAXTOL
+#define RELAXTOL    1.0e-12L        // relative change of the energy per step to stop imaginary time relaxation (long double)
+#endif
+#ifndef PROFILE
+#define PROFILE     0               // write timings to profile.jsonl every X saved steps (int), 0 = off
+#endif
 
-/* Note: Total time in ns should be about > 1000 * M (in u) */
\ No newline at end of file
+/* Note: Total time in ns should be about > 1000 * M (in u) */
+/* Note: With ADAPTIVE = 1 the time step is controlled by step doubling such
+         that the local error stays below TOL. DT is then the initial step,
+         and the total time MAXT * DT and the save interval SAVEEVERY * DT
+         are physical times. Files are still labelled by t / DT. */
+/* Note: With GRIDSTRETCH = s > 0 the grid r_j = s DR sinh(j/s) is used, with
+         spacing DR at the origin growing exponentially for j >> s. */
+/* Note: With CAPWIDTH > 0 the outer CAPWIDTH grid points absorb outgoing
+         probability, so N can be chosen smaller. CAPRATE times the time
+         the packet needs to cross the layer should be >> 1, and the layer
+         should span several wavelengths to avoid reflections.
+         The norm at every saved step is written to norm.dat. */
+/* Note: With PROFILE > 0 the wall clock time spent in the potential, the
+         linear solver (kinetic step for ssfm.c) and saving is measured,
+         together with the bytes written and steps per second. The
+         cumulative values are appended as one JSON object per line to
+         profile.jsonl, see read_profile in python_scripts/helpers.py. */
+/* Note: Started with argument 'i', sne.c relaxes the initial wave function
+         in imaginary time to the stationary state of lowest energy, using
+         DT as imaginary time step and at most MAXT steps; the energy is
+         written to energy.dat every SAVEEVERY steps. The result is saved
+         as time step 0, so real time runs can be started from it with
+         'f path 0' (or 'c path 0'). */
@@ -0,0 +1,73 @@
+/* This code is part of Schroedinger Newton Inhibitions of Dispersion
+   (C) Copyright Andre Grossardt 2010-2023
+   https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+   
+   This code is licensed under the MIT License (see LICENSE.txt for details)
+ */
+
+/* 
+ * This file contains the calculation of the gravitational potential,
+ * which is shared by the Crank-Nicolson and the split-step integrators.
+ */
+
+/* Includes */
+#include <complex.h>
+#include <math.h>
+
+/* Parameters for the run are in param.h */
+#include "param.h"
+/* Radial grid */
+#include "grid.h"
+
+/* Grid dependent factors for the potential sums, set in potential_init */
+static long double qx1[N];
+static long double qx2[N];
+static long double xinv[N];
+
+
+/* Initialise the grid dependent factors for the potential
+ *   v_j = 1/x_j sum_{i<j} |psi_i|^2 x_i^2 w_i + sum_{i>=j} |psi_i|^2 x_i w_i
+ * with x_i = r_i / dr and quadrature weights w_i in units of dr.
+ * On the uniform grid x_i = i and w_i = 1, cf. Background section in README.
+ */
+void potential_init ( void )
+{
+    long double x;
+    int i;
+    
+    qx1[0] = 0.0L;
+    qx2[0] = 0.0L;
+    xinv[0] = 0.0L;
+    for ( i=1; i<N; ++i )
+    {
+        x = grid_r ( i ) / DR;
+        xinv[i] = 1.0L / x;
+        qx1[i] = x * grid_weight ( i ) / DR;
+        qx2[i] = x * qx1[i];
+    }
+}
+
+/* Calculate the sums v for the potential Phi_j = -4 pi G m (dr)^2 v_j
+ * Returns v_0 in v[0] and v_j - v_0 in v[j] for j > 0.
+ */
+void potential_sums ( long double complex psi[N], long double v[N] )
+{
+    long double psisq;
+    long double qx1_sum = 0.0L;
+    long double qx2_sum = 0.0L;
+    int i;
+    
+    /* Calculate v - v0 in first loop making use of
+       v_j = v_0 + 1/x_j sum_{i<j} psi^2 x_i^2 w_i - sum_{i<j} psi^2 x_i w_i
+       (i = 0 does not contribute as x_0 = 0)
+     */
+    for ( i=1; i<N; ++i )
+    {
+        psisq = cabsl ( psi[i] );
+        psisq *= psisq;
+        v[i] = qx2_sum * xinv[i] - qx1_sum;
+        qx1_sum += psisq * qx1[i];
+        qx2_sum += psisq * qx2[i];
+    }
+    v[0] = qx1_sum;
+}
@@ -0,0 +1,15 @@
+/* This code is part of Schroedinger Newton Inhibitions of Dispersion
+   (C) Copyright Andre Grossardt 2010-2023
+   https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+   
+   This code is licensed under the MIT License (see LICENSE.txt for details)
+ */
+
+/* Header file for potential.c */
+
+#ifndef MODULE_POTENTIAL_H
+#define MODULE_POTENTIAL_H
+#include "param.h"
+void potential_init ( void );
+void potential_sums ( long double complex psi[N], long double v[N] );
+#endif /* MODULE_POTENTIAL_H */
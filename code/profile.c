@@ -0,0 +1,128 @@
+/* This code is part of Schroedinger Newton Inhibitions of Dispersion
+   (C) Copyright Andre Grossardt 2010-2023
+   https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+   
+   This code is licensed under the MIT License (see LICENSE.txt for details)
+ */
+
+/* 
+ * This file contains timers and counters for profiling a run.
+ * If PROFILE > 0, one line in JSON format with the cumulative times and
+ * counters of this run is appended to profile.jsonl in the output path
+ * every PROFILE saved steps. Times are wall clock times in s.
+ */
+
+/* Includes */
+#include <stdlib.h>
+#include <stdio.h>
+#include <time.h>
+
+/* Parameters for the run are in param.h */
+#include "param.h"
+/* Phases */
+#include "profile.h"
+
+#if PROFILE
+static const char *phase_names[PHASES] = { "potential", "solve", "save" };
+
+/* cumulative time in s, number of calls and maximal time per phase */
+static double phase_time[PHASES];
+static double phase_max[PHASES];
+static unsigned long phase_calls[PHASES];
+static struct timespec phase_begin[PHASES];
+/* bytes of wave functions written */
+static unsigned long io_bytes = 0;
+/* start of the run and of the current interval */
+static struct timespec run_begin;
+static struct timespec interval_begin;
+static unsigned long interval_steps = 0;
+
+
+/* Wall clock time in s */
+static double wall_time ( struct timespec *ts )
+{
+    return ( (double) ts->tv_sec + 1.0e-9 * (double) ts->tv_nsec );
+}
+
+/* Start the clock for the whole run */
+void profile_init ( void )
+{
+    clock_gettime ( CLOCK_MONOTONIC, &run_begin );
+    interval_begin = run_begin;
+    io_bytes = 0;
+}
+
+/* Start timer of a phase */
+void profile_start ( int phase )
+{
+    clock_gettime ( CLOCK_MONOTONIC, &phase_begin[phase] );
+}
+
+/* Stop timer of a phase */
+void profile_stop ( int phase )
+{
+    struct timespec now;
+    double elapsed;
+    
+    clock_gettime ( CLOCK_MONOTONIC, &now );
+    elapsed = wall_time ( &now ) - wall_time ( &phase_begin[phase] );
+    phase_time[phase] += elapsed;
+    if ( elapsed > phase_max[phase] )
+    {
+        phase_max[phase] = elapsed;
+    }
+    ++phase_calls[phase];
+}
+
+/* Count bytes written */
+void profile_bytes ( unsigned long bytes )
+{
+    io_bytes += bytes;
+}
+
+/* Append timers and counters to profile.jsonl, called at every saved step
+ * arguments: t (current time step), steps (number of steps in this run),
+ *            path, force (write even if not at a multiple of PROFILE saves)
+ */
+void profile_write ( unsigned long t, unsigned long steps, const char *path, int force )
+{
+    static unsigned long saves = 0;
+    struct timespec now;
+    FILE *fp;
+    char filename[256];
+    double wall;
+    double interval;
+    int i;
+    
+    if ( ++saves % PROFILE && ! force )
+    {
+        return;
+    }
+    clock_gettime ( CLOCK_MONOTONIC, &now );
+    wall = wall_time ( &now ) - wall_time ( &run_begin );
+    interval = wall_time ( &now ) - wall_time ( &interval_begin );
+    sprintf ( filename, "%s/profile.jsonl" , path );
+    if ( ( fp = fopen ( filename, "a" ) ) == NULL )
+    {
+        printf ( "Cannot open file. Quitting.\n" );
+        exit( 0 );
+    }
+    fprintf ( fp, "{\"t\": %lu, \"steps\": %lu, \"wall\": %.6f", t, steps, wall );
+    fprintf ( fp, ", \"steps_per_s\": %.6g, \"interval_steps_per_s\": %.6g",
+              wall > 0.0 ? (double) steps / wall : 0.0,
+              interval > 0.0 ? (double) ( steps - interval_steps ) / interval : 0.0 );
+    fprintf ( fp, ", \"phases\": {" );
+    for ( i=0; i<PHASES; ++i )
+    {
+        fprintf ( fp, "%s\"%s\": {\"time\": %.6f, \"calls\": %lu, \"max\": %.6g}",
+                  i ? ", " : "", phase_names[i], phase_time[i], phase_calls[i], phase_max[i] );
+    }
+    fprintf ( fp, "}, \"io\": {\"bytes\": %lu, \"writes\": %lu, \"latency\": %.6g, \"max_latency\": %.6g}}\n",
+              io_bytes, phase_calls[PHASE_SAVE],
+              phase_calls[PHASE_SAVE] ? phase_time[PHASE_SAVE] / phase_calls[PHASE_SAVE] : 0.0,
+              phase_max[PHASE_SAVE] );
+    fclose ( fp );
+    interval_begin = now;
+    interval_steps = steps;
+}
+#endif /* PROFILE */
@@ -0,0 +1,42 @@
+/* This code is part of Schroedinger Newton Inhibitions of Dispersion
+   (C) Copyright Andre Grossardt 2010-2023
+   https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+   
+   This code is licensed under the MIT License (see LICENSE.txt for details)
+ */
+
+/* Header file for profile.c
+ * The PROFILE_* macros expand to nothing if PROFILE is 0, so the
+ * instrumentation has no overhead unless it is switched on in param.h.
+ */
+
+#ifndef MODULE_PROFILE_H
+#define MODULE_PROFILE_H
+#include "param.h"
+
+/* Phases of a run that are timed separately */
+#define PHASE_POTENTIAL 0
+#define PHASE_SOLVE     1
+#define PHASE_SAVE      2
+#define PHASES          3
+
+void profile_init ( void );
+void profile_start ( int phase );
+void profile_stop ( int phase );
+void profile_bytes ( unsigned long bytes );
+void profile_write ( unsigned long t, unsigned long steps, const char *path, int force );
+
+#if PROFILE
+#define PROFILE_INIT() profile_init ( )
+#define PROFILE_START(phase) profile_start ( phase )
+#define PROFILE_STOP(phase) profile_stop ( phase )
+#define PROFILE_BYTES(bytes) profile_bytes ( bytes )
+#define PROFILE_WRITE(t, steps, path, force) profile_write ( t, steps, path, force )
+#else
+#define PROFILE_INIT()
+#define PROFILE_START(phase)
+#define PROFILE_STOP(phase)
+#define PROFILE_BYTES(bytes)
+#define PROFILE_WRITE(t, steps, path, force)
+#endif /* PROFILE */
+#endif /* MODULE_PROFILE_H */
@@ -3,7 +3,7 @@
 # This code is part of Schroedinger Newton Inhibitions of Dispersion
 # (C) Copyright Andre Grossardt 2010-2023
 # https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
-# 
+#
 # This code is licensed under the MIT License (see LICENSE.txt for details)
 #
 # This script compiles and runs the program.
@@ -12,21 +12,31 @@
 # ./run.sh c path time      : continues from given path and timestep
 # ./run.sh safe s           : compile in safe mode with fewer optimization
 # ./run.sh safe c path time : same but continues calculation
-# 
+# Adding 'spectral' before the mode (e.g. ./run.sh spectral s or
+# ./run.sh safe spectral s) uses the split-step integrator in ssfm.c
+# instead of the Crank-Nicolson integrator in sne.c.
+#
 # Edit line 22 to set the path to the output files.
 #
-if [[ "$1" != "safe" ]]
-then echo "Warning: you are in fast mode. Use 'run.sh safe' for safe mode."
-fi
 tms=`date +%s`
 out="/PATH/TO/OUTPUT/FILES/sne${tms}"
-if [[ "$1" == "safe" ]]
-then gcc -lm -ffast-math -funroll-loops -march=core2 -o $out sne.c wf.c helpers.c
-else gcc -O3 -DCHECK_OFF -lm -ffast-math -funroll-loops -march=core2 -o $out sne.c wf.c helpers.c
+safe=0
+main="sne.c"
+while [[ "$1" == "safe" || "$1" == "spectral" ]]
+do
+    if [[ "$1" == "safe" ]]
+    then safe=1
+    else main="ssfm.c"
+    fi
+    shift
+done
+if [[ $safe == 0 ]]
+then echo "Warning: you are in fast mode. Use 'run.sh safe' for safe mode."
 fi
-date
-if [[ "$1" == "safe" ]]
-then $out $2 $3 $4
-else $out $1 $2 $3
+if [[ $safe == 1 ]]
+then gcc -lm -ffast-math -funroll-loops -march=core2 -o $out $main wf.c grid.c potential.c dst.c profile.c helpers.c
+else gcc -O3 -DCHECK_OFF -lm -ffast-math -funroll-loops -march=core2 -o $out $main wf.c grid.c potential.c dst.c profile.c helpers.c
 fi
+date
+$out $1 $2 $3
 rm $out
@@ -23,82 +23,79 @@
 #include "param.h"
 /* Wave function shapes */
 #include "wf.h"
+/* Radial grid */
+#include "grid.h"
+/* Gravitational potential */
+#include "potential.h"
 /* Helper functions */
 #include "helpers.h"
-
-/* Define some constants for relevant pre-factors
- * These numbers are in SI units whereas parameters are given in
- * atomic mass units (u), nanometers (nm), and nanoseconds (ns).
- */
-/* pi * G / hbar * (1u in kg)^2 */
-#define PIGOHBAR 5.4824699260461014e-30L
-/* -hbar / 8 * 10^9 / (1u in kg) */
-#define MHBAROEI -7.9384748449675167L
+/* Optional timers and counters */
+#include "profile.h"
+/* Physical constants */
+#include "constants.h"
 
 /* Activate floating point exceptions */
 #pragma STDC FENV_ACCESS ON
 /* test only for: FE_INVALID, FE_DIVBYZERO, FE_OVERFLOW, FE_UNDERFLOW*/
 #define MY_FE_EXCEPT 29
 
+/* Order of the local error of one step in dt, used for adaptive step
+   size control: the potential is evaluated at the beginning of the step
+   (first order scheme) or averaged with the predicted potential at the
+   end of the step (second order predictor-corrector) */
+#if INTEGRATOR == 'p'
+#define ERR_ORDER 3
+#else
+#define ERR_ORDER 2
+#endif
+
 /* prefactor: -i hbar/(8m) dt/(dr)^2 */
 static const long double complex pre_beta = MHBAROEI * I / M / DR / DR * DT;
-/* prefactors for diagonal elements b */
-static const long double complex b_pre = 0.5L - 2.0L * MHBAROEI * I / M / DR / DR * DT;
-static const long double complex bn_pre = 0.5L - 6.0L * MHBAROEI * I / M / DR / DR * DT;
 /* prefactor for gravitation potential: V = (-) i * (pi G / hbar) dt (m dr)^2 * coupling constant */
 static const long double complex v_pre = I * COUP * PIGOHBAR * DT * M * DR * M * DR;
+#if CAPWIDTH > 0
+/* prefactor for absorbing layer: dt/4 * maximum absorption rate / CAPWIDTH^2 */
+static const long double cap_pre = 0.25L * DT * CAPRATE / CAPWIDTH / CAPWIDTH;
+#endif
 
 
-
-
-/* Calculate the potential */
-void grav_potential ( long double complex psi[N], long double complex b[N] )
+/* Calculate the potential
+ * arguments: psi, bk (kinetic part of diagonal), b (diagonal, output)
+ */
+void grav_potential ( long double complex psi[N], long double complex bk[N], long double complex b[N] )
 {
     long double v[N];
-    long double psisq;
-    long double qi_sum;
+    #if CAPWIDTH > 0
     long double ldi;
+    #endif
     int i;
     
-    /* Calculate v - v0 in first loop making use of
-       v_j = v_0 + 1/j sum psi^2 i^2 - sum psi^2 i
-     */
-    psisq = cabsl ( psi[1] );
-    psisq *= psisq;
-    qi_sum = 0.5L * psisq;
-    v[0] = psisq;
-    v[1] = 0.0L;
-    for ( i=2; i<=(N-2); ++i )
-    {
-        ldi = (long double) i;
-        psisq = cabsl ( psi[i] );
-        psisq *= psisq;
-        psisq *= ldi;
-        v[i] = qi_sum - v[0];
-        v[0] += psisq;
-        ldi /= ( ldi + 1.0L );
-        qi_sum += psisq;
-        qi_sum *= ldi;
-    }
-    psisq = cabsl ( psi[N-1] );
-    psisq *= psisq;
-    v[N-1] = qi_sum - v[0];
-    v[0] += psisq * (long double) (N-1);
+    potential_sums ( psi, v );
     
     /* Calculate diagonal elements b, the real v_i is v_i + v_0 */
-    b[0] = bn_pre - v_pre * v[0];
+    b[0] = bk[0] - v_pre * v[0];
     for ( i=1; i<N; ++i )
     {
-        b[i] = b_pre - v_pre * ( v[0] + v[i] );
+        b[i] = bk[i] - v_pre * ( v[0] + v[i] );
     }
+    #if CAPWIDTH > 0
+    /* Add complex absorbing potential -i hbar eta(r) in the outer layer,
+     * eta rises quadratically from 0 to CAPRATE at the boundary.
+     */
+    for ( i=N-CAPWIDTH; i<N; ++i )
+    {
+        ldi = (long double) ( i - N + CAPWIDTH + 1 );
+        b[i] += cap_pre * ldi * ldi;
+    }
+    #endif /* CAPWIDTH */
     /* Check if v is big enough to make a difference
-     * i.e. make sure that b_0 is not equal to bn_pre.
+     * i.e. make sure that b_0 is not equal to bk_0.
      * As v_0 > v_j for all j>0 considering b_0 is enough.
      * Due to efficiency, do this only if CHECK_OFF is not set.
      */
     #ifndef CHECK_OFF
     static int check_potential = 1;
-    if ( check_potential && b[0] == bn_pre )
+    if ( check_potential && b[0] == bk[0] )
     {
         printf ( "Potential too weak to be represented numerically!\n" );
         check_potential = 0;
@@ -106,19 +103,32 @@ void grav_potential ( long double complex psi[N], long double complex b[N] )
     #endif /* CHECK_OFF */
 }
 
-/* Calculate inital Q matrix off-diagonals */
-void q_init ( long double complex a[N], long double complex c[N] )
+/* Calculate inital Q matrix off-diagonals and kinetic part of diagonal
+ * The Laplacian is discretized as 1/r^2 d/dr ( r^2 d/dr ) using
+ * r_{j+1/2}^2 = r_j r_{j+1}, which reduces to the form given in the
+ * Background section in README on the uniform grid and keeps Q symmetric
+ * with respect to the weights r_j^2 w_j on a mapped grid.
+ */
+void q_init ( long double complex a[N], long double complex bk[N], long double complex c[N] )
 {
-    long double iinv;
+    long double xm, x, xp;
+    long double hm, hp;
     int i;
     
-    /* a (subdiagonal), b (diagonal), c (superdiagonal) */
-    c[0] = 6.0L * pre_beta;
+    /* a (subdiagonal), b (diagonal), c (superdiagonal), all in units of dr */
+    xp = grid_r ( 1 ) / DR;
+    c[0] = 6.0L * pre_beta / xp / xp;
+    bk[0] = 0.5L - c[0];
     for ( i=1; i<N; ++i )
     {
-        iinv = 1.0L / (long double) i;
-        a[i] = pre_beta * (1.0L - iinv);
-        c[i] = pre_beta * (1.0L + iinv);
+        xm = grid_r ( i-1 ) / DR;
+        x = grid_r ( i ) / DR;
+        xp = grid_r ( i+1 ) / DR;
+        hm = x - xm;
+        hp = xp - x;
+        a[i] = 2.0L * pre_beta * xm / ( x * hm * ( hm + hp ) );
+        c[i] = 2.0L * pre_beta * xp / ( x * hp * ( hm + hp ) );
+        bk[i] = 0.5L - a[i] - c[i];
     }
 }
 
@@ -151,28 +161,323 @@ void solve_linear_system ( long double complex a[N], long double complex b[N], l
     }
 }
 
+/* Calculate the diagonal b of Q for a time step of length s * DT,
+ * Q(s DT) = 1/2 + s (Q(DT) - 1/2)
+ * b0 is the diagonal for DT of psi if already known, else NULL
+ */
+static void step_diagonal ( long double complex psi[N], long double complex bk[N], long double complex b[N], long double s, const long double complex *b0 )
+{
+    int i;
+    
+    if ( b0 == NULL )
+    {
+        PROFILE_START ( PHASE_POTENTIAL );
+        grav_potential ( psi, bk, b );
+        PROFILE_STOP ( PHASE_POTENTIAL );
+    }
+    else
+    {
+        for ( i=0; i<N; ++i )
+        {
+            b[i] = b0[i];
+        }
+    }
+    if ( s != 1.0L )
+    {
+        for ( i=0; i<N; ++i )
+        {
+            b[i] = 0.5L + s * ( b[i] - 0.5L );
+        }
+    }
+}
+
+/* Advance psi by one time step of length s * DT
+ * arguments: a, c (off-diagonals of Q already scaled by s),
+ *            bk (kinetic part of diagonal for DT), psi, s,
+ *            b0 (diagonal for DT of psi if already known, else NULL)
+ * For INTEGRATOR 'p' the step is repeated with the average of the
+ * potentials of psi^n and the predicted psi^{n+1}.
+ */
+void time_step ( long double complex a[N], long double complex bk[N], long double complex c[N], long double complex psi[N], long double s, const long double complex *b0 )
+{
+    long double complex b[N];
+    #if INTEGRATOR == 'p'
+    long double complex bp[N];
+    long double complex psip[N];
+    int i;
+    #endif
+    
+    step_diagonal ( psi, bk, b, s, b0 );
+    #if INTEGRATOR == 'p'
+    /* predictor with potential of psi^n */
+    for ( i=0; i<N; ++i )
+    {
+        psip[i] = psi[i];
+    }
+    PROFILE_START ( PHASE_SOLVE );
+    solve_linear_system ( a, b, c, psip );
+    PROFILE_STOP ( PHASE_SOLVE );
+    /* corrector with averaged potential */
+    step_diagonal ( psip, bk, bp, s, NULL );
+    for ( i=0; i<N; ++i )
+    {
+        b[i] = 0.5L * ( b[i] + bp[i] );
+    }
+    #endif /* INTEGRATOR */
+    PROFILE_START ( PHASE_SOLVE );
+    solve_linear_system ( a, b, c, psi );
+    PROFILE_STOP ( PHASE_SOLVE );
+}
+
+#if ADAPTIVE
+/* Advance psi by one step of length s * DT (b0 as for time_step) */
+void scaled_step ( long double complex a[N], long double complex bk[N], long double complex c[N], long double complex psi[N], long double s, const long double complex *b0 )
+{
+    long double complex as[N];
+    long double complex cs[N];
+    int i;
+    
+    for ( i=0; i<N; ++i )
+    {
+        as[i] = s * a[i];
+        cs[i] = s * c[i];
+    }
+    time_step ( as, bk, cs, psi, s, b0 );
+}
+
+/* Advance psi by s * DT with step doubling error control
+ * Compares one step of length s * DT with two steps of length s * DT / 2.
+ * Returns the relative local error estimate; psi is only replaced by the
+ * result of the two half steps if the error does not exceed TOL.
+ */
+long double adaptive_step ( long double complex a[N], long double complex bk[N], long double complex c[N], long double complex psi[N], long double s )
+{
+    long double complex psi1[N];
+    long double complex psi2[N];
+    long double complex b0[N];
+    static long double wgt[N];
+    static int init_wgt = 1;
+    long double diff;
+    long double err = 0.0L;
+    long double nrm = 0.0L;
+    int i;
+    
+    /* weights r^2 w of the norm */
+    if ( init_wgt )
+    {
+        for ( i=0; i<N; ++i )
+        {
+            diff = grid_r ( i );
+            wgt[i] = diff * diff * grid_weight ( i );
+        }
+        init_wgt = 0;
+    }
+    for ( i=0; i<N; ++i )
+    {
+        psi1[i] = psi[i];
+        psi2[i] = psi[i];
+    }
+    /* the full and the first half step start from the same potential */
+    PROFILE_START ( PHASE_POTENTIAL );
+    grav_potential ( psi, bk, b0 );
+    PROFILE_STOP ( PHASE_POTENTIAL );
+    scaled_step ( a, bk, c, psi1, s, b0 );
+    scaled_step ( a, bk, c, psi2, 0.5L * s, b0 );
+    scaled_step ( a, bk, c, psi2, 0.5L * s, NULL );
+    /* relative error in the norm */
+    for ( i=1; i<N; ++i )
+    {
+        diff = cabsl ( psi2[i] - psi1[i] );
+        err += diff * diff * wgt[i];
+        diff = cabsl ( psi2[i] );
+        nrm += diff * diff * wgt[i];
+    }
+    err = sqrtl ( err / nrm );
+    if ( err <= TOL )
+    {
+        for ( i=0; i<N; ++i )
+        {
+            psi[i] = psi2[i];
+        }
+    }
+    return ( err );
+}
+#endif /* ADAPTIVE */
+
+/* Check for floating point exceptions */
+static void check_exceptions ( unsigned long t )
+{
+    #ifndef CHECK_OFF
+    if ( fetestexcept( MY_FE_EXCEPT ) )
+    {
+        printf ( "WARNING: A floating point exception occured for t=%lu: ", t );
+        if ( fetestexcept( FE_INVALID ) ) printf( "INVALID " );
+        if ( fetestexcept( FE_DIVBYZERO ) ) printf( "DIVBYZERO " );
+        if ( fetestexcept( FE_OVERFLOW ) ) printf( "OVERFLOW " );
+        if ( fetestexcept( FE_UNDERFLOW ) ) printf( "UNDERFLOW " );
+        printf ( "\n" );
+        feclearexcept( FE_ALL_EXCEPT );
+    }
+    #endif /* CHECK_OFF */
+}
+
+
+/* One step of imaginary time relaxation
+ * psi <- (1 + DT H / hbar)^-1 psi (backward Euler, so that all excited
+ * components decay), with a, bk, c already converted by relax.
+ * Returns the energy <T> + <V>/2 of psi before the step in hbar/ns.
+ */
+static long double relax_step ( long double complex a[N], long double complex bk[N], long double complex c[N], long double complex psi[N], long double wgt[N] )
+{
+    long double complex b[N];
+    long double complex psi0[N];
+    long double complex kpsi;
+    long double v[N];
+    long double vi;
+    long double p2;
+    long double energy = 0.0L;
+    long double nrm = 0.0L;
+    int i;
+    
+    potential_sums ( psi, v );
+    for ( i=0; i<N; ++i )
+    {
+        /* potential part of the diagonal, DT V / hbar (real) */
+        vi = creall ( 4.0L * I * v_pre * ( i ? v[0] + v[i] : v[0] ) );
+        b[i] = bk[i] + vi;
+        /* DT T psi / hbar with psi_N = 0 */
+        kpsi = ( bk[i] - 1.0L ) * psi[i];
+        if ( i > 0 )
+            kpsi += a[i] * psi[i-1];
+        if ( i < N-1 )
+            kpsi += c[i] * psi[i+1];
+        p2 = creall ( conjl ( psi[i] ) * psi[i] );
+        energy += wgt[i] * ( creall ( conjl ( psi[i] ) * kpsi ) + 0.5L * vi * p2 );
+        nrm += wgt[i] * p2;
+        psi0[i] = psi[i];
+    }
+    /* solve_linear_system returns Q^-1 psi - psi */
+    solve_linear_system ( a, b, c, psi );
+    for ( i=0; i<N; ++i )
+    {
+        psi[i] += psi0[i];
+    }
+    return ( energy / nrm / DT );
+}
+
+/* Relax psi to the stationary state of lowest energy in imaginary time
+ * with step DT for at most MAXT steps, until the relative change of the
+ * energy per step is below RELAXTOL. psi is renormalized after every step.
+ * The energy is written to energy.dat every SAVEEVERY steps.
+ */
+void relax ( long double complex psi[N], const char *path )
+{
+    long double complex a[N];
+    long double complex bk[N];
+    long double complex c[N];
+    long double wgt[N];
+    long double norm0 = 0.0L;
+    long double nrm;
+    long double energy;
+    long double energy_old = 0.0L;
+    unsigned long k;
+    FILE *fp;
+    char filename[256];
+    int converged = 0;
+    int i;
+    
+    /* Q = 1/2 + i DT H / (4 hbar) becomes 1 + DT H / hbar */
+    q_init ( a, bk, c );
+    potential_init ( );
+    for ( i=0; i<N; ++i )
+    {
+        if ( i > 0 )
+            a[i] *= -4.0L * I;
+        c[i] *= -4.0L * I;
+        bk[i] = 1.0L - 4.0L * I * ( bk[i] - 0.5L );
+        /* weights r^2 w of the norm */
+        nrm = grid_r ( i );
+        wgt[i] = nrm * nrm * grid_weight ( i );
+        norm0 += wgt[i] * creall ( conjl ( psi[i] ) * psi[i] );
+    }
+    sprintf ( filename, "%s/energy.dat" , path );
+    if ( ( fp = fopen ( filename, "w" ) ) == NULL )
+    {
+        printf ( "Cannot open file. Quitting.\n" );
+        exit( 0 );
+    }
+    for ( k=1; k<=MAXT; ++k )
+    {
+        energy = relax_step ( a, bk, c, psi, wgt );
+        nrm = 0.0L;
+        for ( i=0; i<N; ++i )
+        {
+            nrm += wgt[i] * creall ( conjl ( psi[i] ) * psi[i] );
+        }
+        nrm = sqrtl ( norm0 / nrm );
+        for ( i=0; i<N; ++i )
+        {
+            psi[i] *= nrm;
+        }
+        converged = ( k > 1 && fabsl ( energy - energy_old ) <= RELAXTOL * fabsl ( energy ) );
+        if ( ! ( k % SAVEEVERY ) || converged )
+        {
+            /* columns: step, energy in hbar/ns, relative change */
+            fprintf ( fp, "%lu\t%.18Le\t%.6Le\n", k-1, energy, fabsl ( energy - energy_old ) / fabsl ( energy ) );
+            progress ( k );
+        }
+        check_exceptions ( k );
+        if ( converged )
+        {
+            break;
+        }
+        energy_old = energy;
+    }
+    fclose ( fp );
+    if ( converged )
+    {
+        printf ( "\nConverged after %lu steps, energy %.12Le hbar/ns.\n", k, energy );
+    }
+    else
+    {
+        printf ( "\nWARNING: Not converged after %lu steps, energy %.12Le hbar/ns.\n", MAXT, energy );
+    }
+}
+
 
 /* Main routine */
 int main ( int argc, char *argv[] )
 {
     long double complex psi[N];
     long double complex a[N];
-    long double complex b[N];
+    long double complex bk[N];
     long double complex c[N];
     unsigned long t = 0;
+    unsigned long steps = 0;
     char path[238];
     int cont = 0;
+    #if ADAPTIVE
+    unsigned long tnext;
+    long double s = 1.0L;
+    long double s_try;
+    long double span;
+    long double tau;
+    long double err;
+    int last;
+    #endif
     
     /* Should we continue a former calculation? */
     if ( argc > 1 )
     {
-        /* only c and s are allowed as first argument and continue mode needs three arguments */
-        if ( ( argv[1][0] != 'c' && argv[1][0] != 's' ) || ( argv[1][0] == 'c' && argc < 4 ) )
+        /* only c, f, i and s are allowed as first argument and continue and fork mode need three arguments */
+        if ( ( argv[1][0] != 'c' && argv[1][0] != 's' && argv[1][0] != 'f' && argv[1][0] != 'i' ) || ( ( argv[1][0] == 'c' || argv[1][0] == 'f' ) && argc < 4 ) )
         {
             printf ( "Error: Wrong number or type of arguments.\n" );
             printf ( "First argument must be either 's' (start new calculation) or 'c' (continue), " );
-            printf ( "second argument must be the subpath (e.g. '20100101-0000') and " );
-            printf ( "third argument must be the time step for continue mode.\nQuitting...\n" );
+            printf ( "second argument must be the subpath (e.g. '20100101-0000', optional for 's') and " );
+            printf ( "third argument must be the time step for continue mode.\n" );
+            printf ( "Or: 'f' (fork), path of the parent run, time step and optional subpath of the new run.\n" );
+            printf ( "Or: 'i' (imaginary time relaxation) and optional subpath.\nQuitting...\n" );
             exit( 0 );
         }
         else if ( argv[1][0] == 'c' ) /* continue calculation */
@@ -187,54 +492,140 @@ int main ( int argc, char *argv[] )
             /* Notify and ask if we should continue */
             cont_notify ( t, path );
         }
+        else if ( argv[1][0] == 'f' ) /* fork from a saved step of another run */
+        {
+            cont = 1;
+            t = ( unsigned long ) atol ( argv[3] );
+            /* Load wave function and create new output path */
+            fork_run ( path, argv[2], t, argc > 4 ? argv[4] : NULL, psi );
+        }
     }
     
     if ( ! cont )
     {
         /* Create output directory */
-        make_outpath ( path, OUTDIR );
+        make_outpath ( path, OUTDIR, argc > 2 ? argv[2] : NULL );
         /* Initialise wave function */
         wave_function ( psi );
+        if ( argc > 1 && argv[1][0] == 'i' )
+        {
+            /* replace the initial wave function by the stationary state */
+            relax ( psi, path );
+        }
+        /* Save the radial grid and the initial wave function */
+        save_grid ( path );
+        save_wf ( t, psi, path );
+        save_norm ( t, psi, path );
+        save_time ( t, steps, DT, path );
     }
     
     /* save the parameters of this run (append if continue) */
-    save_settings ( path, t );
+    if ( argc > 1 && argv[1][0] == 'i' )
+    {
+        /* the stationary state is saved as t = 0 to start new runs from */
+        save_settings ( path, t, "imaginary-time" );
+        printf ( "Done.\n" );
+        return ( 0 );
+    }
+    save_settings ( path, t, "crank-nicolson" );
     
-    /* Initialise Q matrix */
-    q_init ( a, c );
+    /* Initialise Q matrix and potential */
+    q_init ( a, bk, c );
+    potential_init ( );
+    PROFILE_INIT ( );
     
+    #if ADAPTIVE
+    /* iterate wave function with adaptive time step s * DT,
+     * saving at the fixed times t = k * SAVEEVERY (in units of DT)
+     */
+    while ( t < MAXT )
+    {
+        tnext = t + SAVEEVERY - t % SAVEEVERY;
+        if ( tnext > MAXT )
+        {
+            tnext = MAXT;
+        }
+        span = (long double) ( tnext - t );
+        tau = 0.0L;
+        last = 0;
+        while ( ! last )
+        {
+            /* do not step beyond the next save time */
+            s_try = s;
+            if ( s_try >= span - tau )
+            {
+                s_try = span - tau;
+                last = 1;
+            }
+            err = adaptive_step ( a, bk, c, psi, s_try );
+            if ( err <= TOL )
+            {
+                tau += s_try;
+                ++steps;
+            }
+            else /* step rejected */
+            {
+                last = 0;
+            }
+            /* new step size for error TOL, the error of a step is
+             * O(s^ERR_ORDER); keep s if the step was only shortened
+             * to hit the save time
+             */
+            if ( s_try == s || err > TOL )
+            {
+                s = s_try * fminl ( 2.0L, fmaxl ( 0.2L, 0.9L * powl ( TOL / err, 1.0L / ERR_ORDER ) ) );
+            }
+            if ( s < 1.0e-10L )
+            {
+                printf ( "Error: Time step too small at t=%lu. Quitting.\n", t );
+                exit( 0 );
+            }
+            check_exceptions ( t );
+        }
+        t = tnext;
+        /* Save this step */
+        PROFILE_START ( PHASE_SAVE );
+        save_wf ( t, psi, path );
+        PROFILE_STOP ( PHASE_SAVE );
+        save_norm ( t, psi, path );
+        save_time ( t, steps, s * DT, path );
+        PROFILE_WRITE ( t, steps, path, t == MAXT );
+        /* Print progress */
+        progress ( t );
+    }
+    #else
     /* iterate wave function */
     while ( t++ < MAXT )
     {
-        grav_potential ( psi, b );
-        solve_linear_system ( a, b, c, psi );
+        time_step ( a, bk, c, psi, 1.0L, NULL );
+        ++steps;
         if ( ! ( int ) ( t % SAVEEVERY ) )
         {
             /* Save this step */
+            PROFILE_START ( PHASE_SAVE );
             save_wf ( t, psi, path );
+            PROFILE_STOP ( PHASE_SAVE );
+            save_norm ( t, psi, path );
+            save_time ( t, steps, DT, path );
+            PROFILE_WRITE ( t, steps, path, t == MAXT );
             /* Print progress */
             progress ( t );
         }
         /* Check for exceptions */
-        #ifndef CHECK_OFF
-        if ( fetestexcept( MY_FE_EXCEPT ) )
-        {
-            printf ( "WARNING: A floating point exception occured for t=%lu: ", t );
-            if ( fetestexcept( FE_INVALID ) ) printf( "INVALID " );
-            if ( fetestexcept( FE_DIVBYZERO ) ) printf( "DIVBYZERO " );
-            if ( fetestexcept( FE_OVERFLOW ) ) printf( "OVERFLOW " );
-            if ( fetestexcept( FE_UNDERFLOW ) ) printf( "UNDERFLOW " );
-            printf ( "\n" );
-            feclearexcept( FE_ALL_EXCEPT );
-        }
-        #endif /* CHECK_OFF */
+        check_exceptions ( t );
     }
     
     /* Save final wavefunction if not already done */
     if ( ( int ) ( --t % SAVEEVERY ) )
     {
+        PROFILE_START ( PHASE_SAVE );
         save_wf ( t, psi, path );
+        PROFILE_STOP ( PHASE_SAVE );
+        save_norm ( t, psi, path );
+        save_time ( t, steps, DT, path );
+        PROFILE_WRITE ( t, steps, path, 1 );
     }
+    #endif /* ADAPTIVE */
     
     /* finished */
     progress ( MAXT );
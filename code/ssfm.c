@@ -0,0 +1,232 @@
+/* This code is part of Schroedinger Newton Inhibitions of Dispersion
+   (C) Copyright Andre Grossardt 2010-2023
+   https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+   
+   This code is licensed under the MIT License (see LICENSE.txt for details)
+ */
+
+/* 
+ * Alternative main file using a split-step spectral integrator.
+ * Runs the simulation of the Schrödinger-Newton equation for the
+ * parameters defined in param.h and outputs wave function files
+ * to the specified path in the same format as sne.c.
+ * The kinetic step is done exactly for u = r psi in the basis of
+ * sine functions vanishing at r = 0 and r = N dr, the potential
+ * step is done exactly in position space (Strang splitting).
+ */
+
+/* Includes */
+#include <stdlib.h>
+#include <stdio.h>
+#include <complex.h>
+#include <math.h>
+
+/* Parameters for the run are in param.h */
+#include "param.h"
+/* Wave function shapes */
+#include "wf.h"
+/* Radial grid */
+#include "grid.h"
+/* Gravitational potential */
+#include "potential.h"
+/* Discrete sine transform */
+#include "dst.h"
+/* Helper functions */
+#include "helpers.h"
+/* Optional timers and counters */
+#include "profile.h"
+/* Physical constants */
+#include "constants.h"
+
+#if GRIDSTRETCH > 0
+#error "The split-step integrator requires a uniform grid (GRIDSTRETCH 0)"
+#endif
+#if ADAPTIVE
+#error "The split-step integrator does not support adaptive time steps (ADAPTIVE 0)"
+#endif
+
+/* prefactor for kinetic phase: -hbar/(2m) dt (pi / (N dr))^2 */
+static const long double kin_pre = 4.0L * MHBAROEI / M * DT * M_PIl / N / DR * M_PIl / N / DR;
+/* prefactor for potential phase of a half step: -V dt / (2 hbar) = v_pre * v */
+static const long double v_pre = 2.0L * COUP * PIGOHBAR * DT * M * DR * M * DR;
+#if CAPWIDTH > 0
+/* prefactor for absorbing layer: -dt/2 * maximum absorption rate / CAPWIDTH^2 */
+static const long double cap_pre = -0.5L * DT * CAPRATE / CAPWIDTH / CAPWIDTH;
+#endif
+
+
+/* Calculate the kinetic propagator exp(-i hbar k^2 dt / (2m)) for u_k */
+void kinetic_init ( long double complex kin[N] )
+{
+    long double k;
+    int i;
+    
+    kin[0] = 0.0L;
+    for ( i=1; i<N; ++i )
+    {
+        k = (long double) i;
+        /* includes normalisation 2/N of the inverse transform */
+        kin[i] = 2.0L / N * cexpl ( I * kin_pre * k * k );
+    }
+}
+
+/* Half step with the potential, psi -> exp(-i V dt / (2 hbar)) psi */
+void potential_step ( long double complex psi[N] )
+{
+    long double v[N];
+    #if CAPWIDTH > 0
+    long double ldi;
+    #endif
+    int i;
+    
+    potential_sums ( psi, v );
+    psi[0] *= cexpl ( I * v_pre * v[0] );
+    for ( i=1; i<N; ++i )
+    {
+        psi[i] *= cexpl ( I * v_pre * ( v[0] + v[i] ) );
+    }
+    #if CAPWIDTH > 0
+    /* damping exp(-eta dt / 2) by the absorbing layer, cf. sne.c */
+    for ( i=N-CAPWIDTH; i<N; ++i )
+    {
+        ldi = (long double) ( i - N + CAPWIDTH + 1 );
+        psi[i] *= expl ( cap_pre * ldi * ldi );
+    }
+    #endif /* CAPWIDTH */
+}
+
+/* Full step with the kinetic term for u = r psi */
+void kinetic_step ( long double complex kin[N], long double complex psi[N] )
+{
+    long double ldi;
+    int i;
+    
+    for ( i=1; i<N; ++i )
+    {
+        psi[i] *= (long double) i;
+    }
+    dst ( psi );
+    for ( i=1; i<N; ++i )
+    {
+        psi[i] *= kin[i];
+    }
+    dst ( psi );
+    for ( i=1; i<N; ++i )
+    {
+        ldi = (long double) i;
+        psi[i] /= ldi;
+    }
+    /* psi is even in r: psi_0 from psi_1 and psi_2 */
+    psi[0] = ( 4.0L * psi[1] - psi[2] ) / 3.0L;
+}
+
+
+/* Main routine */
+int main ( int argc, char *argv[] )
+{
+    long double complex psi[N];
+    long double complex kin[N];
+    unsigned long t = 0;
+    unsigned long steps = 0;
+    char path[238];
+    int cont = 0;
+    
+    /* Should we continue a former calculation? */
+    if ( argc > 1 )
+    {
+        /* only c, f and s are allowed as first argument and continue and fork mode need three arguments */
+        if ( ( argv[1][0] != 'c' && argv[1][0] != 's' && argv[1][0] != 'f' ) || ( argv[1][0] != 's' && argc < 4 ) )
+        {
+            printf ( "Error: Wrong number or type of arguments.\n" );
+            printf ( "First argument must be either 's' (start new calculation) or 'c' (continue), " );
+            printf ( "second argument must be the subpath (e.g. '20100101-0000', optional for 's') and " );
+            printf ( "third argument must be the time step for continue mode.\n" );
+            printf ( "Or: 'f' (fork), path of the parent run, time step and optional subpath of the new run.\nQuitting...\n" );
+            exit( 0 );
+        }
+        else if ( argv[1][0] == 'c' ) /* continue calculation */
+        {
+            cont = 1;
+            /* rebuild name of output path */
+            outpath_name ( path, OUTDIR, argv[2] );
+            /* read time where to continue */
+            t = ( unsigned long ) atol ( argv[3] );
+            /* Load wave function from saved file */
+            load_wf ( t, psi, path );
+            /* Notify and ask if we should continue */
+            cont_notify ( t, path );
+        }
+        else if ( argv[1][0] == 'f' ) /* fork from a saved step of another run */
+        {
+            cont = 1;
+            t = ( unsigned long ) atol ( argv[3] );
+            /* Load wave function and create new output path */
+            fork_run ( path, argv[2], t, argc > 4 ? argv[4] : NULL, psi );
+        }
+    }
+    
+    if ( ! cont )
+    {
+        /* Create output directory */
+        make_outpath ( path, OUTDIR, argc > 2 ? argv[2] : NULL );
+        /* Initialise wave function */
+        wave_function ( psi );
+        /* Save the radial grid and the initial wave function */
+        save_grid ( path );
+        save_wf ( t, psi, path );
+        save_norm ( t, psi, path );
+        save_time ( t, t, DT, path );
+    }
+    
+    /* save the parameters of this run (append if continue) */
+    save_settings ( path, t, "split-step" );
+    
+    /* Initialise propagators and potential */
+    kinetic_init ( kin );
+    potential_init ( );
+    dst_init ( );
+    PROFILE_INIT ( );
+    
+    /* iterate wave function */
+    while ( t++ < MAXT )
+    {
+        PROFILE_START ( PHASE_POTENTIAL );
+        potential_step ( psi );
+        PROFILE_STOP ( PHASE_POTENTIAL );
+        PROFILE_START ( PHASE_SOLVE );
+        kinetic_step ( kin, psi );
+        PROFILE_STOP ( PHASE_SOLVE );
+        PROFILE_START ( PHASE_POTENTIAL );
+        potential_step ( psi );
+        PROFILE_STOP ( PHASE_POTENTIAL );
+        ++steps;
+        if ( ! ( int ) ( t % SAVEEVERY ) )
+        {
+            /* Save this step */
+            PROFILE_START ( PHASE_SAVE );
+            save_wf ( t, psi, path );
+            PROFILE_STOP ( PHASE_SAVE );
+            save_norm ( t, psi, path );
+            save_time ( t, t, DT, path );
+            PROFILE_WRITE ( t, steps, path, t == MAXT );
+            /* Print progress */
+            progress ( t );
+        }
+    }
+    
+    /* Save final wavefunction if not already done */
+    if ( ( int ) ( --t % SAVEEVERY ) )
+    {
+        PROFILE_START ( PHASE_SAVE );
+        save_wf ( t, psi, path );
+        PROFILE_STOP ( PHASE_SAVE );
+        save_norm ( t, psi, path );
+        save_time ( t, t, DT, path );
+        PROFILE_WRITE ( t, steps, path, 1 );
+    }
+    
+    /* finished */
+    progress ( MAXT );
+    printf ( "\nDone.\n" );
+    return ( 0 );
+}
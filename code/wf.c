@@ -18,6 +18,8 @@
 
 /* Parameters for the run are in param.h */
 #include "param.h"
+/* Radial grid */
+#include "grid.h"
 
 /* All wave functions are in nm^(-3/2) */
 
@@ -28,25 +30,26 @@ static void gaussian_wf ( long double complex psi[N] )
      * Normalisation: int |psi(x)|^2 d3x = 4 pi int |psi(r)|^2 r^2 dr = 1 / nm^3
      */
     static long double prefact;
-    static const long double exp_pre = -.5L * DR / W * DR / W;
+    static const long double exp_pre = -.5L / W / W;
+    long double r;
     int i;
     
     prefact = sqrtl ( M_2_SQRTPIl / W * M_2_SQRTPIl / W * M_2_SQRTPIl / W / 8.0L );
     for ( i=0; i<N; ++i )
     {
-        psi[i] = ( long double complex ) ( prefact * expl( ( ( long double ) ( i*i ) ) * exp_pre ) );
+        r = grid_r ( i );
+        psi[i] = ( long double complex ) ( prefact * expl( r * r * exp_pre ) );
     }
 }
 
 /* Rect wave package */
 static void rect_wf ( long double complex psi[N] )
 {
-    /* Theta function, psi 0 to rect_index are rect_value */
-    static const int rect_index = ( int ) ( W / DR );
+    /* Theta function, psi is rect_value for r <= W */
     static long double complex rect_value;
     rect_value = 0.48860251190291992 / W / sqrtl ( W );
     int i = 0;
-    while ( i<=rect_index )
+    while ( i<N && grid_r ( i ) <= W )
     {
         psi[i++] = rect_value;
     }
@@ -63,13 +66,15 @@ static void rect_wf ( long double complex psi[N] )
 static void exp_ball_wf ( long double complex psi[N] )
 {
     static long double prefact;
-    static const long double exp_pre = -5.0L * DR / W;
+    static const long double exp_pre = -5.0L / W;
+    long double r;
     int i;
     
     prefact = 5.82692496315775504289805709761433814768e-3L / sqrtl ( W * W * W * W * W );
     for ( i=0; i<N; ++i )
     {
-        psi[i] = ( long double complex ) ( prefact * i * expl( ( ( long double ) i ) * exp_pre ) );
+        r = grid_r ( i );
+        psi[i] = ( long double complex ) ( prefact * r * expl( r * exp_pre ) );
     }
 }
 
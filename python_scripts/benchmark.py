@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Schroedinger Newton Inhibitions of Dispersion
+# (C) Copyright Andre Grossardt 2010-2023
+# https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+#
+# This code is licensed under the MIT License (see LICENSE.txt for details)
+
+"""
+This script runs a benchmark suite for the simulation and the evaluation
+scripts on synthetic runs created in a temporary directory and writes the
+results to a JSON file, or compares two such files.
+
+Benchmarks:
+    steps:      time steps per second for different grid sizes, compiler
+                modes (fast/safe as in run.sh) and integrators
+    write:      snapshot write throughput of save_wf (MB/s, timed by the
+                simulation compiled with PROFILE)
+    read:       snapshot read throughput of read_waves (MB/s)
+    observable: snapshots per second for rmax, r90 and halfwidth
+    movie:      frames per second for rendering movie frames
+
+Called with the following arguments:
+
+benchmark.py run outfile [quick]
+
+    outfile: JSON file for the results
+    quick: if given, a reduced set of smaller benchmarks is run
+
+benchmark.py compare old_file new_file [threshold]
+
+    old_file, new_file: JSON files written by benchmark.py run
+    threshold: relative slowdown reported as regression (default 0.1)
+
+Exits with status 1 if compare finds a regression.
+"""
+
+import sys
+import os
+import json
+import time
+import shutil
+import platform
+import subprocess
+import tempfile
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+from helpers import read_waves, read_grid, read_profile
+from solver import compile_solver, run_solver, CODE_DIR
+from rmax import rmax
+from r90 import rc
+from masstime import halfwidth
+from movie import write_frame
+
+# parameters of the synthetic runs
+BASE_PARAMS = {'W': 500., 'M': 5e9, 'DR': 10., 'DT': 1e10, 'COUP': 1.}
+# integrators: name -> (backend, parameters)
+VARIANTS = {'cn': ('cn', {'INTEGRATOR': 'l'}),
+            'cn-pc': ('cn', {'INTEGRATOR': 'p'}),
+            'spectral': ('spectral', {})}
+REPEATS = 3
+SIZES = [500, 1000, 2000, 5100]
+STEPS = 2000
+SNAPSHOTS = 200
+FRAMES = 20
+QUICK_SIZES = [200, 500]
+QUICK_STEPS = 1000
+QUICK_SNAPSHOTS = 50
+QUICK_FRAMES = 5
+
+
+def time_run(workdir, name, params, mode='fast', backend='cn'):
+    """
+    Compiles and runs the simulation in a new directory, the run is
+    repeated REPEATS times to reduce the influence of other processes
+
+    Args:
+        workdir: directory for executable and results
+        name: name of the run
+        params: parameters of the run
+        mode: compiler mode ('fast' or 'safe')
+        backend: integrator backend ('cn' or 'spectral')
+
+    Returns:
+        tuple (minimal wall time of the run in s, path to the results)
+    """
+    outdir = os.path.join(workdir, name)
+    binary = os.path.join(workdir, name + '.bin')
+    params = dict(params, OUTDIR=outdir)
+    compile_solver(binary, params, mode, backend)
+    elapsed = []
+    for i in range(REPEATS):
+        if os.path.exists(outdir):
+            shutil.rmtree(outdir)
+        start = time.perf_counter()
+        run_solver(binary, ['s'])
+        elapsed.append(time.perf_counter() - start)
+    os.remove(binary)
+    return min(elapsed), os.path.join(outdir, os.listdir(outdir)[0])
+
+def bench_steps(workdir, sizes, steps):
+    """
+    Time steps per second for all grid sizes, compiler modes and
+    integrators (only initial and final step are saved)
+    """
+    results = []
+    for n in sizes:
+        for mode in 'fast', 'safe':
+            for variant, (backend, extra) in sorted(VARIANTS.items()):
+                params = dict(BASE_PARAMS, N=n, MAXT=steps, SAVEEVERY=steps,
+                              **extra)
+                name = 'steps-%s-%s-%d' % (variant, mode, n)
+                elapsed, path = time_run(workdir, name, params, mode,
+                                         backend)
+                shutil.rmtree(os.path.dirname(path))
+                results.append({'benchmark': 'steps', 'variant': variant,
+                                'mode': mode, 'n': n,
+                                'value': steps / elapsed,
+                                'unit': 'steps/s'})
+                print('%-10s %-8s %-5s n=%-6d %12.1f steps/s'
+                      % ('steps', variant, mode, n, steps / elapsed))
+    return results
+
+def bench_io(workdir, n, snapshots):
+    """
+    Snapshot write throughput of save_wf (from the save timer of a run
+    compiled with PROFILE, saving every step) and read throughput of
+    read_waves
+
+    Returns:
+        tuple (results, path to the run with all snapshots)
+    """
+    # PROFILE larger than the number of saves: only the final record
+    params = dict(BASE_PARAMS, N=n, MAXT=snapshots, SAVEEVERY=1,
+                  PROFILE=snapshots + 1)
+    path = time_run(workdir, 'io-save', params)[1]
+    profile = read_profile(path)[-1]
+    nbytes = snapshots * n * np.dtype('complex256').itemsize
+    results = []
+    write = profile['io']['bytes'] / 1e6 \
+        / max(profile['phases']['save']['time'], 1e-9)
+    results.append({'benchmark': 'write', 'n': n, 'value': write,
+                    'unit': 'MB/s'})
+    start = time.perf_counter()
+    read_waves(path + '/', n, snapshots, 1)
+    read = nbytes / 1e6 / (time.perf_counter() - start)
+    results.append({'benchmark': 'read', 'n': n, 'value': read,
+                    'unit': 'MB/s'})
+    print('%-10s n=%-6d %12.1f MB/s' % ('write', n, write))
+    print('%-10s n=%-6d %12.1f MB/s' % ('read', n, read))
+    return results, path
+
+def bench_observables(path, n, snapshots):
+    """
+    Snapshots per second for the observables of rmax.py, r90.py and
+    masstime.py
+    """
+    psi = read_waves(path + '/', n, snapshots, 1)
+    x = read_grid(path, n, BASE_PARAMS['DR'])
+    functions = {'rmax': lambda p: rmax(p, x),
+                 'r90': lambda p: rc(p, x),
+                 'halfwidth': lambda p: halfwidth(p, x)}
+    results = []
+    for name, func in sorted(functions.items()):
+        start = time.perf_counter()
+        for p in psi:
+            func(p)
+        rate = len(psi) / (time.perf_counter() - start)
+        results.append({'benchmark': 'observable', 'variant': name, 'n': n,
+                        'value': rate, 'unit': 'snapshots/s'})
+        print('%-10s %-8s n=%-6d %12.1f snapshots/s'
+              % ('observable', name, n, rate))
+    return results
+
+def bench_movie(workdir, path, n, frames):
+    """
+    Frames per second for rendering movie frames as in movie.py
+    """
+    psi = read_waves(path + '/', n, frames, 1)
+    x = read_grid(path, n, BASE_PARAMS['DR'])
+    y = np.array((np.abs(psi) * x)**2, 'float')
+    start = time.perf_counter()
+    for i in range(frames):
+        filename = os.path.join(workdir, 'frame%08d.png' % i)
+        write_frame(filename, x, y[i], (y.min(), y.max()), 'benchmark')
+    rate = frames / (time.perf_counter() - start)
+    print('%-10s n=%-6d %12.1f frames/s' % ('movie', n, rate))
+    return [{'benchmark': 'movie', 'n': n, 'value': rate,
+             'unit': 'frames/s'}]
+
+def revision():
+    """
+    Returns the git revision of the code (with suffix -dirty if there are
+    uncommitted changes) or 'unknown'
+    """
+    try:
+        return subprocess.check_output(
+            ['git', 'describe', '--always', '--dirty'], cwd=CODE_DIR,
+            stderr=subprocess.DEVNULL, universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def result_key(result):
+    """
+    Returns the key identifying a benchmark result for comparisons
+    """
+    return tuple((k, result[k]) for k in sorted(result)
+                 if k not in ('value', 'unit'))
+
+def compare(old_file, new_file, threshold):
+    """
+    Compares two benchmark result files and prints the ratio new/old of
+    all rates (higher is faster)
+
+    Returns:
+        number of regressions, i.e. rates slower by more than threshold
+    """
+    with open(old_file) as f:
+        old = json.load(f)
+    with open(new_file) as f:
+        new = json.load(f)
+    old_results = dict((result_key(r), r) for r in old['results'])
+    print('old: %s (%s)' % (old['revision'], old['date']))
+    print('new: %s (%s)' % (new['revision'], new['date']))
+    regressions = 0
+    for r in new['results']:
+        key = result_key(r)
+        if key not in old_results:
+            continue
+        ratio = r['value'] / old_results[key]['value']
+        flag = ''
+        if ratio < 1. - threshold:
+            flag = 'REGRESSION'
+            regressions += 1
+        print('%-50s %12.1f -> %12.1f %-12s %6.2fx %s'
+              % (', '.join('%s=%s' % kv for kv in key),
+                 old_results[key]['value'], r['value'], r['unit'], ratio,
+                 flag))
+    return regressions
+
+
+if __name__ == "__main__":
+    # arguments: run, outfile, [quick] or compare, old_file, new_file,
+    # [threshold]
+    if len(sys.argv) < 3 or sys.argv[1] not in ('run', 'compare') or \
+            (sys.argv[1] == 'compare' and len(sys.argv) < 4):
+        print('need arguments: run, outfile, [quick]')
+        print('or: compare, old_file, new_file, [threshold]')
+        exit()
+
+    if sys.argv[1] == 'compare':
+        threshold = 0.1
+        if len(sys.argv) > 4:
+            threshold = float(sys.argv[4])
+        if compare(sys.argv[2], sys.argv[3], threshold):
+            sys.exit(1)
+        exit()
+
+    outfile = sys.argv[2]
+    if len(sys.argv) > 3 and sys.argv[3] == 'quick':
+        sizes, steps = QUICK_SIZES, QUICK_STEPS
+        snapshots, frames = QUICK_SNAPSHOTS, QUICK_FRAMES
+    else:
+        sizes, steps, snapshots, frames = SIZES, STEPS, SNAPSHOTS, FRAMES
+
+    workdir = tempfile.mkdtemp(prefix='sne_benchmark_')
+    try:
+        results = bench_steps(workdir, sizes, steps)
+        io_results, path = bench_io(workdir, sizes[-1], snapshots)
+        results += io_results
+        results += bench_observables(path, sizes[-1], snapshots)
+        results += bench_movie(workdir, path, sizes[-1], frames)
+    finally:
+        shutil.rmtree(workdir)
+
+    with open(outfile, 'w') as f:
+        json.dump({'revision': revision(),
+                   'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+                   'machine': platform.platform(),
+                   'processor': platform.processor(),
+                   'quick': sizes == QUICK_SIZES,
+                   'results': results}, f, indent=1)
+    print('Results written to %s' % outfile)
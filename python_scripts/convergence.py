@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Schroedinger Newton Inhibitions of Dispersion
+# (C) Copyright Andre Grossardt 2010-2023
+# https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+#
+# This code is licensed under the MIT License (see LICENSE.txt for details)
+
+"""
+This script runs a convergence study for one configuration: the simulation
+is run for a ladder of refinement factors f of the spatial step (DR / f with
+N * f grid points), the time step (DT / f with MAXT * f steps) or both, so
+that the grid radius, the total time and the saved times stay the same.
+For every run the observables r90 (radius containing 90% of the
+probability), half width and norm are compared at all saved times with
+those of the finest run (refined in both DR and DT if the ladder 'both' is
+run, else the finest run of the same ladder) and, for COUP = 0 and a gaussian
+initial wave function, with the exact free solution. The maximum relative
+deviations and the wall time of each run are printed as a table and written
+to convergence.txt in the output directory.
+
+The study is described by a JSON file, e.g.
+
+    {"outdir": "/data/convergence1",
+     "params": {"N": 1000, "DR": 2.0, "DT": 1e9, "MAXT": 2000,
+                "SAVEEVERY": 200, "M": 5e9, "COUP": 0},
+     "factors": [0.5, 1, 2, 4],
+     "refine": ["dr", "dt", "both"],
+     "tolerance": 1e-3,
+     "backend": "cn", "mode": "fast"}
+
+with
+    outdir: output directory of the runs
+    params: parameters of param.h of the configuration (factor 1)
+    factors: refinement factors; N * f, MAXT * f and SAVEEVERY * f must be
+             integers
+    refine: ladders to run, 'dr' (spatial step), 'dt' (time step) and/or
+            'both' (optional, default all)
+    tolerance: accepted relative deviation; the cheapest run meeting it is
+               reported (optional, default 1e-3)
+    backend: integrator, 'cn' (sne.c, default) or 'spectral' (ssfm.c)
+    mode: compiler mode, 'fast' (default) or 'safe' as in run.sh
+
+The runs are resumable as in sweep.py, their state is kept in
+convergence.json. Wall times are only comparable if the number of workers
+does not exceed the number of idle CPUs.
+
+Called with the following arguments:
+
+convergence.py studyfile [workers]
+
+    studyfile: JSON file describing the study
+    workers: number of parallel runs (default: 1)
+"""
+
+import sys
+import os
+import json
+import numpy as np
+from helpers import free_solution, read_grid, read_times, read_norm, \
+    grid_weights
+from solver import default_params
+from sweep import run_jobs
+
+STATE_FILE = 'convergence.json'
+LADDERS = ('dr', 'dt', 'both')
+OBSERVABLES = ('r90', 'halfwidth', 'norm')
+# parameters scaled by the refinement factor
+SCALED = ('N', 'DR', 'GRIDSTRETCH', 'CAPWIDTH', 'DT', 'MAXT', 'SAVEEVERY')
+
+
+def r90(psi, r):
+    """
+    Calculate the radius within which 90% of the probability density is
+    contained, interpolated between grid points (cf. rc in r90.py)
+
+    Args:
+        psi: wave function
+        r: radial grid (array)
+
+    Returns:
+        radius within which 90% of the probability density is contained
+    """
+    rho = np.array((np.abs(psi) * r)**2 * grid_weights(r), 'float')
+    # probability within r_i, half of the cell around r_i counts
+    cumulative = np.cumsum(rho) - rho / 2.
+    return float(np.interp(.9 * rho.sum(), cumulative, r))
+
+def halfwidth(psi, r):
+    """
+    Calculate the radius where the wave function goes below half the
+    maximum value, interpolated between grid points (cf. masstime.py)
+
+    Args:
+        psi: wave function
+        r: radial grid (array)
+
+    Returns:
+        half the width of the wave function
+    """
+    rho = np.array(np.abs(psi)**2, 'float')
+    half = rho.max() / 2.
+    below = np.nonzero(rho < half)[0]
+    if len(below) == 0 or below[0] == 0:
+        return float('inf')
+    i = below[0]
+    return float(r[i-1] + (r[i] - r[i-1]) * (rho[i-1] - half)
+                 / (rho[i-1] - rho[i]))
+
+def refined(params, ladder, factor):
+    """
+    Returns the parameters of a run refined by factor in DR (ladder 'dr'),
+    DT ('dt') or both, keeping grid radius, total and saved times fixed
+    """
+    params = dict(params)
+    keys = []
+    if ladder in ('dr', 'both'):
+        params['DR'] = params['DR'] / factor
+        keys += ['N', 'GRIDSTRETCH', 'CAPWIDTH']
+    if ladder in ('dt', 'both'):
+        params['DT'] = params['DT'] / factor
+        keys += ['MAXT', 'SAVEEVERY']
+    for key in keys:
+        value = params[key] * factor
+        if abs(value - round(value)) > 1e-9:
+            print('Error: %s * %g is not an integer' % (key, factor))
+            exit()
+        params[key] = int(round(value))
+    return params
+
+def observables(path, params):
+    """
+    Calculates the observables of a run at all saved times
+
+    Args:
+        path: path to the results of the run
+        params: parameters of the run
+
+    Returns:
+        tuple (times in ns, array of r90, half width and norm per time)
+    """
+    r = read_grid(path, params['N'], params['DR'])
+    steps, times = read_times(path, params['DT'])
+    norm_steps, norms = read_norm(path)
+    norm = dict(zip(norm_steps, norms))
+    values = []
+    for step in steps:
+        psi = np.fromfile('%s/data/w%014d.dat' % (path, step), 'complex256')
+        values.append((r90(psi, r), halfwidth(psi, r),
+                       norm.get(step, np.nan)))
+    return times, np.array(values)
+
+def free_observables(times, params):
+    """
+    Observables of the free solution on the grid of a run (norm is 1)
+    """
+    r = np.array(read_grid(os.path.join(params['OUTDIR'], params['name']),
+                           params['N'], params['DR']), 'float')
+    values = []
+    for t in times:
+        psi = free_solution(params['W'], params['M'], t, params['N'],
+                            params['DR'], r)
+        values.append((r90(psi, r), halfwidth(psi, r), 1.))
+    return np.array(values)
+
+def max_deviation(times, values, ref_times, ref_values):
+    """
+    Maximum relative deviation of each observable from the reference at
+    the times saved in both runs
+    """
+    dev = np.zeros(len(OBSERVABLES))
+    for t, v in zip(times, values):
+        match = np.isclose(ref_times, t, rtol=1e-9, atol=0.)
+        if match.any():
+            ref = ref_values[match][0]
+            dev = np.fmax(dev, np.abs(v - ref) / np.abs(ref))
+    return dev
+
+
+if __name__ == "__main__":
+    # arguments: studyfile, [workers]
+    if len(sys.argv) < 2:
+        print('need arguments: studyfile')
+        print('optional: workers')
+        exit()
+    with open(sys.argv[1]) as f:
+        study = json.load(f)
+    outdir = os.path.abspath(study['outdir'])
+    workers = 1
+    if len(sys.argv) > 2:
+        workers = int(sys.argv[2])
+    base = dict(default_params(), **study['params'])
+    factors = sorted(study['factors'])
+    ladders = study.get('refine', LADDERS)
+    tolerance = study.get('tolerance', 1e-3)
+
+    # the parameters that are scaled are always passed to the compiler
+    config = dict(study['params'], **dict((k, base[k]) for k in SCALED))
+    jobs = []
+    names = {}
+    for ladder in ladders:
+        if ladder not in LADDERS:
+            print('Error: Unknown ladder %s' % ladder)
+            exit()
+        for factor in factors:
+            name = 'base' if factor == 1 else '%s%g' % (ladder, factor)
+            names[(ladder, factor)] = name
+            if name not in [job['name'] for job in jobs]:
+                jobs.append({'name': name,
+                             'params': refined(config, ladder, factor)})
+    state = run_jobs(outdir, jobs, workers, study.get('backend', 'cn'),
+                     study.get('mode', 'fast'), STATE_FILE)
+    failed = [job['name'] for job in jobs
+              if state[job['name']]['state'] != 'done']
+    if failed:
+        print('Failed runs: %s' % ', '.join(sorted(failed)))
+        sys.exit(1)
+
+    free = base['COUP'] == 0 and base['WAVEFUNCT'] == 'g'
+    results = {}
+    for job in jobs:
+        params = dict(base, **job['params'])
+        params.update(OUTDIR=outdir, name=job['name'])
+        times, values = observables(os.path.join(outdir, job['name']),
+                                    params)
+        results[job['name']] = (params, times, values)
+    header = '%-10s %6s %10s %12s %8s %10s' % ('run', 'ladder', 'DR', 'DT',
+                                               'N', 'wall (s)')
+    header += ''.join(' %11s' % ('d_' + o) for o in OBSERVABLES)
+    if free:
+        header += ''.join(' %11s' % ('free_' + o) for o in OBSERVABLES[:2])
+    lines = [header]
+    best = None
+    for ladder in ladders:
+        # the run refined in DR and DT includes both errors of the others
+        finest = names[('both' if 'both' in ladders else ladder,
+                        factors[-1])]
+        ref_times, ref_values = results[finest][1:]
+        for factor in factors:
+            name = names[(ladder, factor)]
+            params, times, values = results[name]
+            wall = state[name]['wall']
+            dev = max_deviation(times, values, ref_times, ref_values)
+            line = '%-10s %6s %10.4g %12.4g %8d %10.2f' % (
+                name, ladder, params['DR'], params['DT'], params['N'], wall)
+            line += ''.join(' %11.3e' % d for d in dev)
+            if free:
+                free_dev = max_deviation(times, values, times,
+                                         free_observables(times, params))
+                line += ''.join(' %11.3e' % d for d in free_dev[:2])
+            lines.append(line)
+            if name != finest and dev.max() <= tolerance and \
+                    (best is None or wall < best[1]):
+                best = (name, wall)
+    lines.append('')
+    if best is None:
+        lines.append('No run meets the tolerance %g' % tolerance)
+    else:
+        lines.append('Cheapest run within tolerance %g: %s (%.2f s)'
+                     % (tolerance, best[0], best[1]))
+    with open(os.path.join(outdir, 'convergence.txt'), 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    print('\n'.join(lines))
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Schroedinger Newton Inhibitions of Dispersion
+# (C) Copyright Andre Grossardt 2010-2023
+# https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+#
+# This code is licensed under the MIT License (see LICENSE.txt for details)
+
+"""
+This script compares two simulation runs with the same parameters, e.g.
+the Crank-Nicolson (sne.c) and the split-step (ssfm.c) integrator, and
+prints the relative difference
+||psi_1 - psi_2|| / ||psi_2||  with  ||psi||^2 = 4 pi int |psi|^2 r^2 dr
+for every physical time saved in both runs (the runs may use different
+time steps).
+
+Called with the following arguments:
+
+crosscheck.py path1 path2 n dr [tolerance dt1 dt2]
+
+    path1: path to the results of the first run
+    path2: path to the results of the second run
+    n: number of grid points
+    dr: grid step size
+    tolerance: maximum accepted relative difference (optional, default 1e-3)
+    dt1, dt2: time steps of the runs (optional, only needed for runs
+              without times.dat)
+
+Exits with status 1 if the relative difference exceeds the tolerance.
+"""
+
+import sys
+import os
+import numpy as np
+from helpers import read_times, read_grid, grid_weights
+
+
+def rel_difference(psi1, psi2, r):
+    """
+    Calculate the relative difference of two wave functions in the norm
+    4 pi int |psi|^2 r^2 dr
+
+    Args:
+        psi1: first wave function
+        psi2: second (reference) wave function
+        r: radial grid (array)
+
+    Returns:
+        relative difference
+    """
+    w = r**2 * grid_weights(r)
+    diff = np.sum(np.abs(psi1 - psi2)**2 * w)
+    return float(np.sqrt(diff / np.sum(np.abs(psi2)**2 * w)))
+
+
+if __name__ == "__main__":
+    # arguments: path1, path2, n, dr, [tolerance, dt1, dt2]
+    if len(sys.argv) < 5:
+        print('need arguments: path1, path2, n, dr')
+        print('optional: tolerance, dt1, dt2')
+        exit()
+    path1 = sys.argv[1]
+    path2 = sys.argv[2]
+    for path in path1, path2:
+        if not os.path.exists(path):
+            print('Error: Path %s does not exist' % path)
+            exit()
+    n = int(sys.argv[3])
+    dr = float(sys.argv[4])
+    tolerance = 1e-3
+    if len(sys.argv) > 5:
+        tolerance = float(sys.argv[5])
+    dt1 = None
+    dt2 = None
+    if len(sys.argv) > 7:
+        dt1 = float(sys.argv[6])
+        dt2 = float(sys.argv[7])
+
+    r = read_grid(path1, n, dr)
+    if not np.allclose(r, read_grid(path2, n, dr)):
+        print('Error: Runs use different grids')
+        exit()
+    steps1, times1 = read_times(path1, dt1)
+    steps2, times2 = read_times(path2, dt2)
+    # match saved steps by physical time, the runs may use different dt
+    pairs = [(s1, steps2[np.isclose(times2, t1, rtol=1e-12, atol=0.)][0], t1)
+             for s1, t1 in zip(steps1, times1)
+             if np.isclose(times2, t1, rtol=1e-12, atol=0.).any()]
+    if len(pairs) == 0:
+        print('Error: No common saved times')
+        exit()
+
+    max_diff = 0.
+    print('%14s\t%14s' % ('time (ns)', 'rel. diff.'))
+    for s1, s2, time in pairs:
+        psi1 = np.fromfile('%s/data/w%014d.dat' % (path1, s1), 'complex256')
+        psi2 = np.fromfile('%s/data/w%014d.dat' % (path2, s2), 'complex256')
+        diff = rel_difference(psi1, psi2, r)
+        max_diff = max(max_diff, diff)
+        print('%14e\t%14e' % (time, diff))
+    print('maximum relative difference: %e' % max_diff)
+    if not max_diff <= tolerance:
+        print('Cross-check FAILED (tolerance %e)' % tolerance)
+        sys.exit(1)
+    print('Cross-check passed (tolerance %e)' % tolerance)
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Schroedinger Newton Inhibitions of Dispersion
+# (C) Copyright Andre Grossardt 2010-2023
+# https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+#
+# This code is licensed under the MIT License (see LICENSE.txt for details)
+
+"""
+This script exports the saved time steps of a run in one pass to binary
+numpy files (or text files), for further processing without reading the
+wave functions again.
+
+Fields (one value per grid point and time step):
+    density:  radial probability density r^2 |psi|^2
+    phase:    phase of the wave function in (-pi, pi]
+    psi:      the wave function (complex, only for format npy)
+Observables (one value per time step):
+    r90:       radius within which 90% of the probability is contained
+    rmax:      peak of the radial probability density
+    halfwidth: radius where |psi|^2 goes below half the maximum
+    norm:      4 pi int |psi|^2 r^2 dr
+
+Files written to the output directory for format npy:
+    meta.json:             description of the export (written last)
+    r.npy:                 radial grid
+    steps.npy, times.npy:  time steps and times in ns
+    <field>_<k>.npy:       block k of a field (time steps x grid points)
+    observables.npy:       array (time steps x observables)
+and for format text (tabulator separated):
+    <field>.txt:           first line nan, nan and r, then one line per
+                           time step with step, time and the values at
+                           all r (np.loadtxt reads it as one array)
+    observables.txt:       one line per time step with step, time and the
+                           observables
+
+Use read_export and read_field to load an export in python.
+
+Called with the following arguments:
+
+export.py path outdir [format fields observables every]
+
+    path: path to the simulation results
+    outdir: output directory
+    format: 'npy' (default) or 'text'
+    fields: comma separated list of fields or 'none' (default: density)
+    observables: comma separated list of observables or 'none'
+                 (default: all)
+    every: export every nth saved time step (default: 1)
+"""
+
+import sys
+import os
+import json
+import numpy as np
+from helpers import read_grid, read_times, iter_waves, grid_weights, \
+    write_columns, StageTimer
+from phasefield import wrapped_phase
+from r90 import rc
+from rmax import rmax
+from masstime import halfwidth
+
+FIELDS = {'density': lambda psi, r: np.array((np.abs(psi) * r)**2, 'float'),
+          'phase': lambda psi, r: wrapped_phase(psi),
+          'psi': lambda psi, r: np.asarray(psi, 'complex128')}
+OBSERVABLES = {'r90': rc,
+               'rmax': rmax,
+               'halfwidth': halfwidth,
+               'norm': lambda psi, r: 4. * np.pi * np.sum(
+                   np.abs(psi)**2 * r**2 * grid_weights(r), axis=-1)}
+CHUNK = 256
+
+
+def export(path, outdir, fields=('density',),
+           observables=tuple(sorted(OBSERVABLES)), fmt='npy', every=1,
+           chunk=CHUNK, timer=None):
+    """
+    Exports fields and observables of all saved time steps of a run in
+    one pass
+
+    Args:
+        path: path to the simulation results
+        outdir: output directory (created if it does not exist)
+        fields: names of fields, see FIELDS
+        observables: names of observables, see OBSERVABLES
+        fmt: 'npy' or 'text'
+        every: export every nth saved time step
+        chunk: number of time steps per block
+        timer: StageTimer for the stages read, compute, write (optional)
+
+    Returns:
+        dictionary with the description of the export (as in meta.json)
+    """
+    if timer is None:
+        timer = StageTimer('export')
+    if fmt == 'text' and 'psi' in fields:
+        print('Error: Field psi can only be exported in npy format')
+        exit()
+    if not os.path.exists(outdir):
+        os.makedirs(outdir)
+    n = os.path.getsize('%s/grid.dat' % path) \
+        // np.dtype('longdouble').itemsize
+    r = read_grid(path, n, None)
+    steps, times = read_times(path)
+    steps, times = steps[::every], times[::every]
+    meta = {'path': os.path.abspath(path), 'n': n, 'format': fmt,
+            'fields': list(fields), 'observables': list(observables),
+            'chunks': {}}
+    rf = np.array(r, 'float')
+    if fmt == 'npy':
+        np.save(os.path.join(outdir, 'r.npy'), rf)
+        np.save(os.path.join(outdir, 'steps.npy'), steps)
+        np.save(os.path.join(outdir, 'times.npy'), times)
+        for name in fields:
+            meta['chunks'][name] = []
+        obs = np.zeros((len(steps), len(observables)))
+    else:
+        files = dict((name, open(os.path.join(outdir, name + '.txt'), 'w'))
+                     for name in fields)
+        # nan for step and time, so all lines have the same columns
+        header = np.concatenate(([np.nan, np.nan], rf))[np.newaxis]
+        for f in files.values():
+            write_columns(f, [header])
+        obsfile = open(os.path.join(outdir, 'observables.txt'), 'w')
+    done = 0
+    timer.start('read')
+    for k, (block_steps, psi) in enumerate(iter_waves(path, steps, chunk)):
+        block_times = times[done:done + len(block_steps)]
+        for name in fields:
+            timer.start('compute')
+            values = FIELDS[name](psi, r)
+            timer.start('write')
+            if fmt == 'npy':
+                filename = '%s_%05d.npy' % (name, k)
+                np.save(os.path.join(outdir, filename), values)
+                meta['chunks'][name].append(filename)
+            else:
+                write_columns(files[name],
+                              [block_steps, block_times, values])
+        if len(observables) > 0:
+            timer.start('compute')
+            block_obs = np.column_stack([OBSERVABLES[name](psi, r)
+                                         for name in observables])
+            timer.start('write')
+            if fmt == 'npy':
+                obs[done:done + len(block_steps)] = block_obs
+            else:
+                write_columns(obsfile,
+                              [block_steps, block_times, block_obs])
+        done += len(block_steps)
+        timer.start('read')
+    timer.start('write')
+    if fmt == 'npy':
+        np.save(os.path.join(outdir, 'observables.npy'), obs)
+    else:
+        for f in list(files.values()) + [obsfile]:
+            f.close()
+    # meta.json is written last, an export without it is incomplete
+    with open(os.path.join(outdir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=1)
+    timer.stop()
+    return meta
+
+def read_export(outdir):
+    """
+    Reads an export in npy format
+
+    Args:
+        outdir: directory of the export
+
+    Returns:
+        tuple (meta data, r, time steps, times, dictionary of observables)
+    """
+    with open(os.path.join(outdir, 'meta.json')) as f:
+        meta = json.load(f)
+    obs = np.load(os.path.join(outdir, 'observables.npy'))
+    return (meta, np.load(os.path.join(outdir, 'r.npy')),
+            np.load(os.path.join(outdir, 'steps.npy')),
+            np.load(os.path.join(outdir, 'times.npy')),
+            dict((name, obs[:, i])
+                 for i, name in enumerate(meta['observables'])))
+
+def read_field(outdir, name, mmap=False):
+    """
+    Reads a field of an export in npy format
+
+    Args:
+        outdir: directory of the export
+        name: name of the field, e.g. 'density'
+        mmap: if True, the blocks are memory mapped and returned as a list
+              instead of being read into one array
+
+    Returns:
+        array (time steps x grid points) or list of blocks
+    """
+    with open(os.path.join(outdir, 'meta.json')) as f:
+        meta = json.load(f)
+    blocks = [np.load(os.path.join(outdir, filename),
+                      mmap_mode='r' if mmap else None)
+              for filename in meta['chunks'][name]]
+    if mmap:
+        return blocks
+    return np.concatenate(blocks)
+
+
+if __name__ == "__main__":
+    # arguments: path, outdir, [format, fields, observables, every]
+    if len(sys.argv) < 3:
+        print('need arguments: path, outdir')
+        print('optional: format, fields, observables, every')
+        exit()
+    path = sys.argv[1]
+    if not os.path.exists(os.path.join(path, 'grid.dat')):
+        print('Error: No grid.dat in %s' % path)
+        exit()
+    outdir = sys.argv[2]
+    fmt = 'npy'
+    fields = ['density']
+    observables = sorted(OBSERVABLES)
+    every = 1
+    if len(sys.argv) > 3:
+        fmt = sys.argv[3]
+    if len(sys.argv) > 4:
+        fields = [] if sys.argv[4] == 'none' else sys.argv[4].split(',')
+    if len(sys.argv) > 5:
+        observables = [] if sys.argv[5] == 'none' \
+            else sys.argv[5].split(',')
+    if len(sys.argv) > 6:
+        every = int(sys.argv[6])
+    if fmt not in ('npy', 'text'):
+        print('Error: Unknown format %s' % fmt)
+        exit()
+    for name in fields:
+        if name not in FIELDS:
+            print('Error: Unknown field %s' % name)
+            exit()
+    for name in observables:
+        if name not in OBSERVABLES:
+            print('Error: Unknown observable %s' % name)
+            exit()
+
+    timer = StageTimer('export.py')
+    meta = export(path, outdir, fields, observables, fmt, every, timer=timer)
+    print('Exported %s to %s' % (path, outdir))
+    timer.report()
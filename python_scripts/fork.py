@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Schroedinger Newton Inhibitions of Dispersion
+# (C) Copyright Andre Grossardt 2010-2023
+# https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+#
+# This code is licensed under the MIT License (see LICENSE.txt for details)
+
+"""
+This script starts several runs from one saved time step of a parent run,
+e.g. to compare different couplings or masses after a common evolution.
+Each child run is written to its own subdirectory of the output directory
+(fork mode 'f parent time subpath' of the simulation); the saved wave
+functions of the parent up to the fork time are linked, not copied. The
+children are run in parallel and resumed like the runs of sweep.py, their
+state is kept in fork.json in the output directory.
+
+The children are described by a JSON file, e.g.
+
+    {"parent": "/data/run1", "time": 50000, "outdir": "/data/run1-forks",
+     "params": {"N": 2000, "DR": 1.0, "MAXT": 100000, "SAVEEVERY": 1000},
+     "grid": {"COUP": [0, 1], "M": [5e9, 1e10]},
+     "backend": "cn", "mode": "fast"}
+
+with
+    parent: path to the results of the parent run
+    time: time step of the parent run to start from (must be saved)
+    outdir: output directory for the child runs
+    params: parameters of param.h for all children; the grid (N, DR,
+            GRIDSTRETCH), the time step DT and ADAPTIVE must be the same
+            as for the parent, so that the physical times continue
+    grid: lists of values of the parameters that differ between the
+          children; every combination is run
+    backend: integrator, 'cn' (sne.c, default) or 'spectral' (ssfm.c)
+    mode: compiler mode, 'fast' (default) or 'safe' as in run.sh
+
+Called with the following arguments:
+
+fork.py run forkfile [workers]
+
+    forkfile: JSON file describing the child runs
+    workers: number of parallel runs (default: number of CPUs)
+
+fork.py status forkfile
+
+    prints the state of all child runs
+"""
+
+import sys
+import os
+import json
+from solver import default_params
+from sweep import expand_grid, run_jobs, load_state, print_status
+
+STATE_FILE = 'fork.json'
+
+
+def fork_jobs(parent, time, grid, params):
+    """
+    Returns the jobs for all child runs, see sweep.run_job
+
+    Args:
+        parent: path to the results of the parent run
+        time: time step of the parent run to start from
+        grid: dictionary of lists of parameter values of the children
+        params: parameters common to all children
+    """
+    jobs = expand_grid(grid)
+    for job in jobs:
+        job['params'] = dict(params, **job['params'])
+        job['start'] = ['f', parent, str(time), job['name']]
+    return jobs
+
+
+if __name__ == "__main__":
+    # arguments: run, forkfile, [workers] or status, forkfile
+    if len(sys.argv) < 3 or sys.argv[1] not in ('run', 'status'):
+        print('need arguments: run, forkfile, [workers]')
+        print('or: status, forkfile')
+        exit()
+    with open(sys.argv[2]) as f:
+        spec = json.load(f)
+    outdir = os.path.abspath(spec['outdir'])
+
+    if sys.argv[1] == 'status':
+        print_status(load_state(outdir, STATE_FILE))
+        exit()
+
+    parent = os.path.abspath(spec['parent'])
+    time = int(spec['time'])
+    if not os.path.exists('%s/data/w%014d.dat' % (parent, time)):
+        print('Error: Time step %d of %s not saved' % (time, parent))
+        exit()
+    jobs = fork_jobs(parent, time, spec['grid'], spec.get('params', {}))
+    for job in jobs:
+        if dict(default_params(), **job['params'])['MAXT'] <= time:
+            print('Error: MAXT of %s is not after the fork time'
+                  % job['name'])
+            exit()
+
+    workers = None
+    if len(sys.argv) > 3:
+        workers = int(sys.argv[3])
+    state = run_jobs(outdir, jobs, workers, spec.get('backend', 'cn'),
+                     spec.get('mode', 'fast'), STATE_FILE)
+    failed = [name for name in state if state[name]['state'] != 'done']
+    if failed:
+        print('Failed runs: %s' % ', '.join(sorted(failed)))
+        sys.exit(1)
+    print('All runs done.')
@@ -10,11 +10,17 @@
 Helper functions for python scripts used to create movies and plots
 """
 
+import os
+import sys
+import json
+import time
 import numpy as np
-import cmath
 from math import pi, sqrt
 
-def free_solution(w, m, t, n, dr):
+# hbar / u in nm^2 / ns
+HBAR_U = 63.50779875974
+
+def free_solution(w, m, t, n, dr, r=None):
     """
     Exactly solve the free particle
 
@@ -24,17 +30,70 @@ def free_solution(w, m, t, n, dr):
         t: time
         n: number of points
         dr: grid step size
+        r: radial grid (optional, default: uniform grid given by n and dr)
 
     Returns:
         wave function at time t
     """
-    # index  [:n] is neccessary to make sure that psi has the right length
-    r = np.arange(0, n * dr, dr, 'complex')[:n]
+    if r is None:
+        # index  [:n] is neccessary to make sure that psi has the right length
+        r = np.arange(0, n * dr, dr, 'complex')[:n]
     # z = m / (m + i hbar alpha t) (dimensionless)
-    z = 1. / (1. + 63.50779875974j / m / w**2 * t)
+    z = 1. / (1. + 1j * HBAR_U / m / w**2 * t)
     psi = (z / sqrt(pi) / w)**1.5 * np.exp(-r**2 * z / 2 / w**2)
     return psi
 
+def read_grid(path, n, dr):
+    """
+    Reads the radial grid of a simulation run (file grid.dat)
+
+    Args:
+        path: path to the simulation results
+        n: number of grid points
+        dr: grid step size (for results without grid file)
+
+    Returns:
+        radii of the grid points
+    """
+    filename = os.path.join(path, 'grid.dat')
+    if os.path.exists(filename):
+        return np.fromfile(filename, 'longdouble')[:n].astype(float)
+    # results from before the grid file was written use the uniform grid
+    return np.arange(n) * dr
+
+def grid_weights(r):
+    """
+    Quadrature weights of a (possibly non-uniform) radial grid such that
+    int f(r) dr = sum(f(r) * grid_weights(r))
+
+    Args:
+        r: radial grid
+
+    Returns:
+        weights (r[j+1] - r[j-1]) / 2
+    """
+    w = np.empty(len(r))
+    w[0] = r[1] / 2.
+    w[1:-1] = (r[2:] - r[:-2]) / 2.
+    w[-1] = r[-1] - r[-2]
+    return w
+
+def saved_steps(max_t, save_every):
+    """
+    Returns the saved time steps of a run after the initial one
+
+    Args:
+        max_t: maximum time step
+        save_every: save every nth time step (parameter of simulation)
+
+    Returns:
+        array of time steps save_every, 2 save_every, ..., max_t
+    """
+    t = list(range(save_every, max_t + 1, save_every))
+    if max_t % save_every > 0:
+        t.append(max_t)
+    return np.array(t, 'int')
+
 def read_waves(path, n, max_t, save_every):
     """
     Read the wave function data from the files
@@ -48,22 +107,41 @@ def read_waves(path, n, max_t, save_every):
     Returns:
         array of wave functions
     """
-    saved = max_t / save_every
-    r = range(saved)
-    t = (np.array(r) + 1) * save_every
-    if max_t % save_every > 0:
-        r.append(saved)
-        t.append(max_t)
-        saved += 1
-    res = np.zeros((saved, n), 'complex256')
+    t = saved_steps(max_t, save_every)
+    res = np.zeros((len(t), n), 'complex256')
     path += "data/"
-    for i in r:
+    for i in range(len(t)):
         filename = '%sw%014d.dat' % (path, t[i])
         res[i] = np.fromfile(filename, 'complex256')
         if not np.isfinite(res[i]).all():
             print('ERROR: NaN in img %s' % i)
     return res
 
+def iter_waves(path, steps, chunk=256):
+    """
+    Reads the wave functions of the given time steps in blocks, so that
+    long runs can be processed without keeping all data in memory
+
+    Args:
+        path: path to the simulation results
+        steps: time steps as used in the file names (e.g. from read_times)
+        chunk: number of wave functions per block
+
+    Yields:
+        tuple (array of time steps, array of wave functions of the block);
+        the array is reused for the next block, copy it to keep it
+    """
+    steps = np.asarray(steps, 'int')
+    block = None
+    for start in range(0, len(steps), chunk):
+        block_steps = steps[start:start + chunk]
+        for i, t in enumerate(block_steps):
+            psi = np.fromfile('%s/data/w%014d.dat' % (path, t), 'complex256')
+            if block is None:
+                block = np.empty((chunk, len(psi)), 'complex256')
+            block[i] = psi
+        yield block_steps, block[:len(block_steps)]
+
 def read_wave(path, t, save_every = 1):
     """
     Reads the wave function at a single time step
@@ -80,20 +158,139 @@ def read_wave(path, t, save_every = 1):
     filename = '%s/data/w%014d.dat' % (path, t * save_every)
     return np.fromfile(filename, 'complex256')
 
+def read_times(path, dt=None):
+    """
+    Reads the physical times of the saved time steps (file times.dat)
+
+    Args:
+        path: path to the simulation results
+        dt: temporal step size (for results without times file, where
+            the saved files are listed instead)
+
+    Returns:
+        tuple of arrays (time steps as used in file names, times in ns)
+    """
+    filename = os.path.join(path, 'times.dat')
+    if os.path.exists(filename):
+        data = np.loadtxt(filename, ndmin=2)
+        # the last entry counts if a run was continued from an earlier step
+        steps, idx = np.unique(data[::-1, 0].astype(int), return_index=True)
+        return steps, data[::-1, 1][idx]
+    if dt is None:
+        print('Error: No times.dat in %s, the time step dt is needed' % path)
+        exit()
+    steps = np.array(sorted(int(f[1:-4]) for f in
+                            os.listdir(os.path.join(path, 'data'))
+                            if f.startswith('w') and f.endswith('.dat')))
+    return steps, steps * dt
+
+def last_saved(path, n):
+    """
+    Finds the last completely saved time step of a (possibly interrupted)
+    run, e.g. to continue it
+
+    Args:
+        path: path to the simulation results
+        n: number of grid points
+
+    Returns:
+        last time step with a complete wave function file that is also
+        listed in times.dat, or None if there is none
+    """
+    datapath = os.path.join(path, 'data')
+    if not os.path.isdir(datapath):
+        return None
+    size = n * np.dtype('complex256').itemsize
+    steps = set(int(f[1:-4]) for f in os.listdir(datapath)
+                if f.startswith('w') and f.endswith('.dat')
+                and os.path.getsize(os.path.join(datapath, f)) == size)
+    if os.path.exists(os.path.join(path, 'times.dat')):
+        try:
+            steps &= set(read_times(path)[0])
+        except ValueError: # incomplete last line
+            return None
+    if len(steps) == 0:
+        return None
+    return int(max(steps))
+
+def read_wave_at(path, time, dt=None):
+    """
+    Reads the saved wave function closest to a given physical time
+
+    Args:
+        path: path to the simulation results
+        time: physical time in ns
+        dt: temporal step size (for results without times file)
+
+    Returns:
+        tuple (wave function, physical time of the saved step in ns)
+    """
+    steps, times = read_times(path, dt)
+    i = np.abs(times - time).argmin()
+    filename = os.path.join(path, 'data', 'w%014d.dat' % steps[i])
+    return np.fromfile(filename, 'complex256'), times[i]
+
+def read_norm(path):
+    """
+    Reads the norm of the wave function written by the simulation for
+    every saved time step (file norm.dat)
+
+    Args:
+        path: path to the simulation results
+
+    Returns:
+        tuple of arrays (time steps, norm)
+    """
+    data = np.loadtxt('%s/norm.dat' % path, ndmin=2)
+    # the last entry counts if a run was continued from an earlier step
+    steps, idx = np.unique(data[::-1, 0].astype(int), return_index=True)
+    return steps, data[::-1, 1][idx]
+
+def read_profile(path):
+    """
+    Reads the timings written by the simulation if compiled with PROFILE > 0
+    (file profile.jsonl), values are cumulative since the start of the run
+    (or of the continued run)
+
+    Args:
+        path: path to the simulation results
+
+    Returns:
+        list of dictionaries, one per record, with keys t, steps, wall,
+        steps_per_s, interval_steps_per_s, phases (potential, solve, save:
+        time, calls, max) and io (bytes, writes, latency, max_latency)
+    """
+    records = []
+    with open('%s/profile.jsonl' % path) as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    return records
+
 def phase(psi):
     """
-    Returns the phase of a given wave function
+    Returns the phase of a given wave function (see phasefield.py for
+    unwrapped and relative phases)
 
     Args:
-        psi: wave function
+        psi: wave function or array of wave functions
 
     Returns:
         phase of the wave function
     """
-    p = np.zeros(len(psi))
-    for i in range(len(psi)):
-        p[i] = cmath.phase(psi[i])
-    return p
+    return np.angle(np.asarray(psi, 'complex128'))
+
+def write_columns(outfile, columns):
+    """
+    Writes data columns separated by tabulators in one call
+
+    Args:
+        outfile: file name or open file (to append a block)
+        columns: list of arrays of equal length
+    """
+    np.savetxt(outfile, np.column_stack([np.asarray(c, 'float')
+                                         for c in columns]),
+               fmt='%e', delimiter='\t')
 
 def html_color(r, g, b):
     """
@@ -133,4 +330,64 @@ def plot_colors():
             html_color(255,248,163), html_color(179,0,35),
             html_color(188,28,57), html_color(196,56,79),
             html_color(214,112,123), html_color(230,165,164)
-            ]
\ No newline at end of file
+            ]
+
+class StageTimer(object):
+    """
+    Measures the wall time spent in the stages of an evaluation script,
+    e.g. read, compute, render and encode:
+
+        timer = StageTimer('movie.py')
+        timer.start('read')
+        psi = read_waves(...)
+        timer.start('compute')
+        ...
+        timer.report()
+
+    Starting a stage stops the previous one.
+    """
+
+    def __init__(self, script):
+        self.script = script
+        self.times = {}
+        self.calls = {}
+        self.stage = None
+        self.begin = time.perf_counter()
+        self.stage_begin = self.begin
+
+    def start(self, stage):
+        """
+        Stops the current stage and starts the given one (None to stop)
+        """
+        now = time.perf_counter()
+        if self.stage is not None:
+            self.times[self.stage] = (self.times.get(self.stage, 0.)
+                                      + now - self.stage_begin)
+            self.calls[self.stage] = self.calls.get(self.stage, 0) + 1
+        self.stage = stage
+        self.stage_begin = now
+
+    def stop(self):
+        """
+        Stops the current stage
+        """
+        self.start(None)
+
+    def result(self):
+        """
+        Returns:
+            dictionary with the total wall time and time and number of
+            calls per stage
+        """
+        self.stop()
+        return {'script': self.script,
+                'wall': time.perf_counter() - self.begin,
+                'stages': dict((k, {'time': self.times[k],
+                                    'calls': self.calls[k]})
+                               for k in self.times)}
+
+    def report(self):
+        """
+        Prints the timings as one line in JSON format to stderr
+        """
+        sys.stderr.write(json.dumps(self.result(), sort_keys=True) + '\n')
@@ -18,47 +18,54 @@ masstime.py path n max_t save_every w m dr dt deviation
     path: path to the data files
     n: number of grid points
     max_t: maximum time up to which the data is read
-    save_every: save every nth time step (parameter of simulation)
+    save_every: save every nth time step (parameter of simulation, unused,
+                the saved steps are taken from times.dat)
     w: width of the initial gaussian
     m: mass of the particle
     dr: grid step size
-    dt: time step size
+    dt: time step size (only used for runs without times.dat)
     deviation: desired relative deviation in width
 """
 
 import sys
 import os
 import numpy as np
-from helpers import free_solution, read_wave
+from helpers import read_grid, read_times, iter_waves, StageTimer
+from phasefield import free_solutions
 
 
-def halfwidth(psi):
+def halfwidth(psi, r):
     """
-    Calculate half the width of the wave function, i.e. the grid point
-    index where the wave function goes below half the maximum value.
+    Calculate half the width of the wave function, i.e. the radius
+    where the wave function goes below half the maximum value.
 
     Args:
-        psi: wave function
+        psi: wave function or array of wave functions
+        r: radial grid (array)
 
     Returns:
-        half the width of the wave function
+        half the width of the wave function (array for an array of wave
+        functions, inf if the wave function does not go below half the
+        maximum)
     """
     rho = (np.abs(psi))**2
-    m = rho.max()
-    for i in range(len(rho)):
-        if rho[i] < m/2.:
-            return float(i)
-    return float('inf')
-
+    below = rho < rho.max(axis=-1, keepdims=True) / 2.
+    width = np.where(below.any(axis=-1),
+                     np.asarray(r, 'float')[below.argmax(axis=-1)],
+                     float('inf'))
+    if np.ndim(psi) == 1:
+        return float(width)
+    return width
 
 if __name__ == "__main__":
     # arguments: path, n, max_t, save_every, w, m, dr, dt, rel. error
-    if len(sys.argv) < 7:
+    if len(sys.argv) < 10:
         print('need args: path, n, max_t, save_every, w, m, dr, dt, rel. error')
         exit()
     path = sys.argv[1]
     if path[-1] != '/':
         path = path + '/'
+    runpath = path
     path += 'data/'
     if not os.path.exists(os.path.dirname(path)):
         print('Error: Path does not exist')
@@ -73,19 +80,25 @@ if __name__ == "__main__":
     err = float(sys.argv[9])
 
     # determine time when width psi/free >= rel. error
-    x = np.arange(n) * dr
-    saved = max_t / save_every
-    r = range(saved)
-    t = (np.array(r) + 1) * save_every
-    if max_t % save_every > 0:
-        r.append(saved)
-        t.append(max_t)
-        saved += 1
-    for i in r:
-        time = (i+1) * save_every * dt
-        f = free_solution(w, m, time, n, dr)
-        g = read_wave(path, t[i], save_every)
-        if abs(1. - halfwidth(g)/halfwidth(f)) > err:
+    timer = StageTimer('masstime.py')
+    x = read_grid(runpath, n, dr)
+    steps, times = read_times(runpath, dt)
+    keep = (steps > 0) & (steps <= max_t)
+    steps, times = steps[keep], times[keep]
+    # widths of a block of time steps at once
+    done = 0
+    timer.start('read')
+    for block_steps, g in iter_waves(runpath, steps):
+        timer.start('compute')
+        block_times = times[done:done + len(block_steps)]
+        f = free_solutions(w, m, block_times, x)
+        deviation = np.abs(1. - halfwidth(g, x) / halfwidth(f, x))
+        if (deviation > err).any():
+            time = block_times[np.argmax(deviation > err)]
             print("%e \t %e" % (m, time / 1.0e9))
+            timer.report()
             exit()
+        done += len(block_steps)
+        timer.start('read')
     print("No difference to free solution")
+    timer.report()
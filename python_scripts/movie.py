@@ -36,7 +36,34 @@ import shutil
 import subprocess
 import numpy as np
 import matplotlib.pyplot as plt
-from helpers import free_solution, read_waves
+from helpers import free_solution, read_waves, read_grid, StageTimer
+
+
+def write_frame(filename, x, y, y_range, plot_title, y_ref=None):
+    """
+    Plots the probability density of a single time step and saves the
+    plot as png file (a frame of the movie)
+
+    Args:
+        filename: name of the png file
+        x: radial grid
+        y: probability density
+        y_range: tuple (y_min, y_max) of the plot range
+        plot_title: title of the plot
+        y_ref: probability density of the free or second solution
+               (optional)
+    """
+    if y_ref is not None:
+        plt.plot(x,y_ref,'r.', label='free')
+    plt.plot(x,y,'b.', label='grav.')
+    plt.axis((x[0],x[-1],y_range[0],y_range[1]))
+    plt.xlabel('r (m)')
+    plt.ylabel('probability')
+    plt.legend()
+    plt.title(plot_title, fontsize=20)
+    plt.savefig(filename, dpi=100)
+    # Clear the figure to make way for the next image.
+    plt.clf()
 
 
 if __name__ == "__main__":
@@ -86,6 +113,8 @@ if __name__ == "__main__":
     # frames per second:
     fps = 25
     
+    timer = StageTimer('movie.py')
+    timer.start('read')
     psi = read_waves(path, n, max_t, save_every)
     if plot_second:
         psi_sec = read_waves(second_path, n, max_t, save_every)
@@ -112,9 +141,10 @@ if __name__ == "__main__":
         sys.exit("quitting\n")
 
     if plot_free:
-        x = np.arange(n) * dr
+        x = read_grid(path, n, dr)
     else:
         x = np.arange(n)
+    timer.start('compute')
     y = (np.abs(psi) * x)**2
     y[y > cutoff] = cutoff
     y = np.array(y,'float');
@@ -132,24 +162,19 @@ if __name__ == "__main__":
     print("y-range: %s to %s" % (y_min, y_max))
 
     for i in range(len(y)) :
+        timer.start('compute')
         if plot_free:
             yf = (x * np.abs(free_solution(w, m, (i+1) * save_every * dt, n,
-                  dr)))**2
-            plt.plot(x,yf,'r.', label='free')
+                  dr, x)))**2
         elif plot_second:
-            plt.plot(x,ys[i],'r.', label='free')
-        plt.plot(x,y[i],'b.', label='grav.')
-        plt.axis((x[0],x[-1],y_min,y_max))
-        plt.xlabel('r (m)')
-        plt.ylabel('probability')
-        plt.legend()
-        plt.title(plot_title, fontsize=20)
-
+            yf = ys[i]
+        else:
+            yf = None
         filename = out_path + str('%08d' % i) + '.png'
-        plt.savefig(filename, dpi=100)
+        timer.start('render')
+        write_frame(filename, x, y[i], (y_min, y_max), plot_title, yf)
+        timer.stop()
         print('Wrote file', filename)
-        # Clear the figure to make way for the next image.
-        plt.clf()
 
     # emulate console call of mencoder
     # mencoder mf://*.png -mf type=png:w=800:h=600:fps=25 -ovc lavc -lavcopts
@@ -170,9 +195,12 @@ if __name__ == "__main__":
                movie_file)
 
     print("\n\nabout to execute:\n%s\n\n" % ' '.join(command))
+    timer.start('encode')
     subprocess.check_call(command)
+    timer.stop()
 
     print("\n\n Deleting %s\n\n" % out_path)
     shutil.rmtree(out_path)
 
     print("\n\n The movie was written to '%s'" % movie_file)
+    timer.report()
@@ -36,7 +36,8 @@ import shutil
 import subprocess
 import numpy as np
 import matplotlib.pyplot as plt
-from helpers import free_solution, read_waves, phase
+from helpers import saved_steps, iter_waves, read_grid, StageTimer
+from phasefield import wrapped_phase, free_solutions
 
 
 if __name__ == "__main__":
@@ -84,9 +85,8 @@ if __name__ == "__main__":
     # frames per second:
     fps = 25
     
-    psi = read_waves(path, n, max_t, save_every)
-    if plot_second:
-        psi_sec = read_waves(second_path, n, max_t, save_every)
+    timer = StageTimer('phase.py')
+    steps = saved_steps(max_t, save_every)
 
     # Create video, this code is mostly from
     # http://matplotlib.sourceforge.net/examples/animation/movie_demo.html
@@ -110,28 +110,45 @@ if __name__ == "__main__":
         sys.exit("quitting\n")
 
     if plot_free:
-        x = np.arange(n) * dr
+        x = read_grid(path, n, dr)
     else:
         x = np.arange(n)
 
-    for i in range(len(psi)) :
+    # the phases of a block of time steps are calculated at once
+    if plot_second:
+        second = iter_waves(second_path, steps)
+    i = 0
+    timer.start('read')
+    for block_steps, psi in iter_waves(path, steps):
+        if plot_second:
+            psi_sec = next(second)[1]
+        timer.start('compute')
+        p = wrapped_phase(psi)
         if plot_free:
-            yf = phase(free_solution(w, m, (i+1) * save_every * dt, n, dr))
-            plt.plot(x,yf,'r.', label='free')
+            pf = wrapped_phase(free_solutions(w, m, block_steps * dt, x))
         elif plot_second:
-            plt.plot(x,yf[i],'r.', label='free')
-        plt.plot(x,phase(psi[i]),'b.', label='grav.')
-        plt.axis((x[0],x[-1],-3.2,3.2))
-        plt.xlabel('r (m)')
-        plt.ylabel('phase')
-        plt.legend()
-        plt.title(plot_title, fontsize=20)
-
-        filename = out_path + str('%08d' % i) + '.png'
-        plt.savefig(filename, dpi=100)
-        print('Wrote file', filename)
-        # Clear the figure to make way for the next image.
-        plt.clf()
+            pf = wrapped_phase(psi_sec)
+        for j in range(len(p)):
+            timer.start('render')
+            if plot_free:
+                plt.plot(x,pf[j],'r.', label='free')
+            elif plot_second:
+                plt.plot(x,pf[j],'r.', label='second')
+            plt.plot(x,p[j],'b.', label='grav.')
+            plt.axis((x[0],x[-1],-3.2,3.2))
+            plt.xlabel('r (m)')
+            plt.ylabel('phase')
+            plt.legend()
+            plt.title(plot_title, fontsize=20)
+
+            filename = out_path + str('%08d' % i) + '.png'
+            plt.savefig(filename, dpi=100)
+            print('Wrote file', filename)
+            # Clear the figure to make way for the next image.
+            plt.clf()
+            i += 1
+        timer.start('read')
+    timer.stop()
 
     # emulate console call of mencoder
     # mencoder mf://*.png -mf type=png:w=800:h=600:fps=25 -ovc lavc -lavcopts
@@ -152,9 +169,12 @@ if __name__ == "__main__":
                movie_file)
 
     print("\n\nabout to execute:\n%s\n\n" % ' '.join(command))
+    timer.start('encode')
     subprocess.check_call(command)
+    timer.stop()
 
     print("\n\n Deleting %s\n\n" % out_path)
     shutil.rmtree(out_path)
 
     print("\n\n The movie was written to '%s'" % movie_file)
+    timer.report()
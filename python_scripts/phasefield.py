@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Schroedinger Newton Inhibitions of Dispersion
+# (C) Copyright Andre Grossardt 2010-2023
+# https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+#
+# This code is licensed under the MIT License (see LICENSE.txt for details)
+
+"""
+Vectorized functions for the phase of wave functions, used by phase.py and
+plotphasefile.py. All functions work on a single wave function (array of
+length n) as well as on blocks of wave functions (array steps x n) as
+returned by read_waves or iter_waves in helpers.py. The calculation is done
+in double precision.
+"""
+
+import numpy as np
+from helpers import free_solution, phase, HBAR_U
+
+
+def wrapped_phase(psi):
+    """
+    Returns the phase of the wave function in (-pi, pi]
+
+    Args:
+        psi: wave function(s)
+
+    Returns:
+        phase (array of the same shape as psi)
+    """
+    return phase(psi)
+
+def unwrapped_phase(psi):
+    """
+    Returns the phase of the wave function made continuous in r, starting
+    from the phase at r = 0
+
+    Args:
+        psi: wave function(s)
+
+    Returns:
+        phase (array of the same shape as psi)
+    """
+    return np.unwrap(wrapped_phase(psi), axis=-1)
+
+def phase_gradient(psi, r):
+    """
+    Returns the radial derivative of the phase, Im(psi* dpsi/dr) / |psi|^2,
+    which does not need unwrapping (nan where psi vanishes)
+
+    Args:
+        psi: wave function(s)
+        r: radial grid (array)
+
+    Returns:
+        derivative of the phase in 1/nm (array of the same shape as psi)
+    """
+    psi = np.asarray(psi, 'complex128')
+    dpsi = np.gradient(psi, np.asarray(r, 'float'), axis=-1)
+    rho = np.abs(psi)**2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(rho > 0., np.imag(np.conj(psi) * dpsi) / rho, np.nan)
+
+def velocity(psi, r, m):
+    """
+    Returns the velocity field hbar / m d(phase)/dr of the wave function
+
+    Args:
+        psi: wave function(s)
+        r: radial grid (array)
+        m: mass of the particle in u
+
+    Returns:
+        velocity in nm/ns (array of the same shape as psi)
+    """
+    return HBAR_U / m * phase_gradient(psi, r)
+
+def relative_phase(psi, psi_ref):
+    """
+    Returns the phase of psi relative to a reference wave function,
+    arg(psi conj(psi_ref)) in (-pi, pi]
+
+    Args:
+        psi: wave function(s)
+        psi_ref: reference wave function(s) of the same shape
+
+    Returns:
+        phase difference (array of the same shape as psi)
+    """
+    return np.angle(np.asarray(psi, 'complex128')
+                    * np.conj(np.asarray(psi_ref, 'complex128')))
+
+def free_solutions(w, m, times, r):
+    """
+    Returns the exact free solution for several times at once
+
+    Args:
+        w: width of the initial gaussian
+        m: mass of the particle
+        times: times in ns (array)
+        r: radial grid (array)
+
+    Returns:
+        array of wave functions (len(times) x len(r))
+    """
+    times = np.asarray(times, 'float')[:, np.newaxis]
+    return free_solution(w, m, times, len(r), None, np.asarray(r, 'float'))
+
+def free_relative_phase(psi, w, m, times, r):
+    """
+    Returns the phase of wave functions relative to the free solution
+
+    Args:
+        psi: block of wave functions (len(times) x len(r))
+        w: width of the initial gaussian
+        m: mass of the particle
+        times: times of the wave functions in ns (array)
+        r: radial grid (array)
+
+    Returns:
+        phase difference (array of the same shape as psi)
+    """
+    return relative_phase(psi, free_solutions(w, m, times, r))
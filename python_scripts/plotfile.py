@@ -32,7 +32,8 @@ to the file name as specified by outfile-prefix.
 
 import sys
 import numpy as np
-from helpers import read_wave, plot_colors
+from helpers import iter_waves, read_grid, plot_colors, write_columns, \
+    StageTimer
 
 
 
@@ -60,13 +61,17 @@ if __name__ == "__main__":
     else:
         colors = plot_colors()
     
-    r = np.arange(n) * dr;
+    timer = StageTimer('plotfile.py')
+    r = read_grid(path, n, dr)
     
-    for i in range(len(times)):
-        t = times[i]
-        psi = read_wave(path, t, save_every)
+    # densities of a block of time steps at once, one call per file
+    steps = np.array(times, 'int') * save_every
+    timer.start('read')
+    for block_steps, psi in iter_waves(path, steps):
+        timer.start('compute')
         rho = (np.abs(psi) * r)**2
-        outfile = open( ( "%s%d" % (outfile_prefix, t) ),'w')
-        for j in range(len(rho)):
-            outfile.write( "%e\t%e\n" % (r[j], rho[j]) )
-        outfile.close()
\ No newline at end of file
+        timer.start('write')
+        for t, rho_t in zip(block_steps // save_every, rho):
+            write_columns("%s%d" % (outfile_prefix, t), [r, rho_t])
+        timer.start('read')
+    timer.report()
\ No newline at end of file
@@ -17,13 +17,16 @@ r2 phase2
 
 Called with the following arguments:
 
-plotphasefile.py path outfile-prefix n save_every dr timesteps
+plotphasefile.py path outfile-prefix n save_every w m dr dt timesteps
 
     path: path to the data files
     outfile-prefix: prefix of the output files
     n: number of grid points
     save_every: save every nth time step (parameter of simulation)
+    w: width of the initial gaussian
+    m: mass of the particle
     dr: grid step size
+    dt: time step size
     timesteps: time steps to plot (separated by spaces)
 
 For every time step a separate file is created with the time value appended
@@ -32,7 +35,9 @@ to the file name as specified by outfile-prefix.
 
 import sys
 import numpy as np
-from helpers import read_wave, plot_colors, phase, free_solution
+from helpers import iter_waves, read_grid, plot_colors, write_columns, \
+    StageTimer
+from phasefield import wrapped_phase, free_solutions
 
 
 if __name__ == "__main__":
@@ -63,17 +68,19 @@ if __name__ == "__main__":
     else:
         colors = plot_colors()
     
-    r = np.arange(n) * dr;
+    timer = StageTimer('plotphasefile.py')
+    r = read_grid(path, n, dr)
     
-    for i in range(len(times)):
-        t = times[i]
-        psi = read_wave(path, n, save_every, t)
-        p = phase(psi)
-        pf = phase(free_solution(w, m, t * save_every * dt, n, dr))
-        outfile = open( ( "%s%d" % (outfile_prefix, t) ),'w')
-        for j in range(len(p)):
-            outfile.write( "%e\t%e\n" % (r[j], p[j]) )
-        outfile = open( ( "%s%d_free" % (outfile_prefix, t) ),'w')
-        for j in range(len(pf)):
-            outfile.write( "%e\t%e\n" % (r[j], pf[j]) )
-        outfile.close()
\ No newline at end of file
+    # phases of a block of time steps at once, one call per file
+    steps = np.array(times, 'int') * save_every
+    timer.start('read')
+    for block_steps, psi in iter_waves(path, steps):
+        timer.start('compute')
+        p = wrapped_phase(psi)
+        pf = wrapped_phase(free_solutions(w, m, block_steps * dt, r))
+        timer.start('write')
+        for t, pt, pft in zip(block_steps // save_every, p, pf):
+            write_columns("%s%d" % (outfile_prefix, t), [r, pt])
+            write_columns("%s%d_free" % (outfile_prefix, t), [r, pft])
+        timer.start('read')
+    timer.report()
\ No newline at end of file
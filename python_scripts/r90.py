@@ -32,34 +32,29 @@ r90.py path n max_t save_every w m dr dt file
 import sys
 import os
 import numpy as np
-from helpers import read_wave
+from helpers import iter_waves, saved_steps, read_grid, grid_weights, \
+    write_columns, StageTimer
 
 
-def rc(psi, r, dr):
+def rc(psi, r):
     """
     Calculate the radius within which 90% of the probability density is
     contained.
 
     Args:
-        psi: wave function
+        psi: wave function or array of wave functions
         r: radial grid (array)
-        dr: grid step size
 
     Returns:
         radius within which 90% of the probability density is contained
+        (array for an array of wave functions)
     """
-    rho = (np.abs(psi) * r)**2
-    rho /= rho.sum()
-    i = 0
-    s = rho[i]
-    while ( s < .9 ):
-        i += 1
-        if i < len(rho):
-            s += rho[i]
-        else:
-            s = 1.0
-    return i * dr
-
+    rho = (np.abs(psi) * r)**2 * grid_weights(r)
+    cumulative = np.cumsum(rho, axis=-1)
+    reached = cumulative >= .9 * cumulative[..., -1:]
+    # first grid point where 90% are reached (last one if rounding errors)
+    i = np.where(reached.any(axis=-1), reached.argmax(axis=-1), len(r) - 1)
+    return r[i]
 
 if __name__ == "__main__":
     # arguments: path, n, max_t, save_every, w, m, dr, dt, file
@@ -70,6 +65,7 @@ if __name__ == "__main__":
     if path[-1] != '/':
         path = path + '/'
     outpath = path
+    runpath = path
     path += 'data/'
     outpath += 'r90.dat'
     if not os.path.exists(os.path.dirname(path)):
@@ -87,19 +83,17 @@ if __name__ == "__main__":
         print('Error: Outfile exists')
         exit()
     outfile = open(outpath,'w')
-    outfile.write( "%e\t%e\n" % (0., w * 1.76796332416) )
+    write_columns(outfile, [[0.], [w * 1.76796332416]])
 
-    x = np.arange(n) * dr
-    saved = max_t / save_every
-    r = range(saved)
-    t = (np.array(r) + 1) * save_every
-    if max_t % save_every > 0:
-        r.append(saved)
-        t.append(max_t)
-        saved += 1
-    for i in r:
-        time = (i+1) * save_every * dt * 1e-9
-        print("t = %e s" % time)
-        psi = read_wave(path, t[i], save_every)
-        outfile.write( "%e\t%e\n" % (time, rc(psi, x, dr)) )
-    outfile.close()
\ No newline at end of file
+    timer = StageTimer('r90.py')
+    x = read_grid(runpath, n, dr)
+    # observable of a block of time steps at once, written in one call
+    timer.start('read')
+    for steps, psi in iter_waves(runpath, saved_steps(max_t, save_every)):
+        timer.start('compute')
+        radius = rc(psi, x)
+        timer.start('write')
+        write_columns(outfile, [steps * dt * 1e-9, radius])
+        timer.start('read')
+    outfile.close()
+    timer.report()
\ No newline at end of file
@@ -31,24 +31,25 @@ rmax.py path n max_t save_every w m dr dt file
 import sys
 import os
 import numpy as np
-from helpers import read_wave
+from helpers import iter_waves, saved_steps, read_grid, write_columns, \
+    StageTimer
 
 
-def rmax(psi, r, dr):
+def rmax(psi, r):
     """
     Calculate the peak of the radial probability density r^2 |psi|^2
     for a given wave function psi.
 
     Args:
-        psi: wave function
+        psi: wave function or array of wave functions
         r: radial grid (array)
-        dr: grid step size
 
     Returns:
-        peak of the radial probability density
+        peak of the radial probability density (array for an array of
+        wave functions)
     """
     rho = (np.abs(psi) * r)**2
-    return rho.argmax() * dr
+    return r[rho.argmax(axis=-1)]
 
 
 if __name__ == "__main__":
@@ -59,6 +60,7 @@ if __name__ == "__main__":
     path = sys.argv[1]
     if path[-1] != '/':
         path = path + '/'
+    runpath = path
     path += 'data/'
     if not os.path.exists(os.path.dirname(path)):
         print('Error: Path does not exist')
@@ -74,18 +76,17 @@ if __name__ == "__main__":
         print('Error: Outfile exists')
         exit()
     outfile = open(sys.argv[9],'w')
-    outfile.write( "%e\t%e\n" % (0., w) )
+    write_columns(outfile, [[0.], [w]])
 
-    x = np.arange(n) * dr
-    saved = max_t / save_every
-    r = range(saved)
-    t = (np.array(r) + 1) * save_every
-    if max_t % save_every > 0:
-        r.append(saved)
-        t.append(max_t)
-        saved += 1
-    for i in r:
-        time = (i+1) * save_every * dt
-        psi = read_wave(path, n, save_every, t[i])
-        outfile.write( "%e\t%e\n" % (time, rmax(psi, x, dr)) )
-    outfile.close()
\ No newline at end of file
+    timer = StageTimer('rmax.py')
+    x = read_grid(runpath, n, dr)
+    # observable of a block of time steps at once, written in one call
+    timer.start('read')
+    for steps, psi in iter_waves(runpath, saved_steps(max_t, save_every)):
+        timer.start('compute')
+        radius = rmax(psi, x)
+        timer.start('write')
+        write_columns(outfile, [steps * dt, radius])
+        timer.start('read')
+    outfile.close()
+    timer.report()
\ No newline at end of file
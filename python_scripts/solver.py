@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Schroedinger Newton Inhibitions of Dispersion
+# (C) Copyright Andre Grossardt 2010-2023
+# https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+#
+# This code is licensed under the MIT License (see LICENSE.txt for details)
+
+"""
+Helper functions for python scripts that compile and run the simulation
+with parameters overriding those in param.h
+"""
+
+import os
+import re
+import subprocess
+
+# directory containing the C code
+CODE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        os.pardir, 'code')
+
+# C type suffix of each parameter in param.h
+PARAM_TYPES = {'W': 'L', 'M': 'L', 'N': 'int', 'DR': 'L',
+               'GRIDSTRETCH': 'int', 'DT': 'L', 'MAXT': 'UL', 'COUP': 'L',
+               'SAVEEVERY': 'UL', 'INTEGRATOR': 'char', 'ADAPTIVE': 'int',
+               'TOL': 'L', 'OUTDIR': 'string', 'WAVEFUNCT': 'char',
+               'CAPWIDTH': 'int', 'CAPRATE': 'L', 'PROFILE': 'int',
+               'RELAXTOL': 'L'}
+
+# compiler flags as in run.sh
+MODE_FLAGS = {'fast': ['-O3', '-DCHECK_OFF', '-ffast-math', '-funroll-loops',
+                       '-march=core2'],
+              'safe': ['-ffast-math', '-funroll-loops', '-march=core2']}
+
+# main file of the integrator
+BACKENDS = {'cn': 'sne.c', 'spectral': 'ssfm.c'}
+
+SOURCES = ['wf.c', 'grid.c', 'potential.c', 'dst.c', 'profile.c',
+           'helpers.c']
+
+
+def param_define(name, value):
+    """
+    Returns the compiler flag setting a parameter of param.h
+
+    Args:
+        name: name of the parameter, e.g. 'N'
+        value: value of the parameter
+
+    Returns:
+        compiler flag, e.g. '-DN=1000'
+    """
+    ctype = PARAM_TYPES[name]
+    if ctype == 'L':
+        literal = '%rL' % float(value)
+    elif ctype == 'UL':
+        literal = '%dUL' % int(value)
+    elif ctype == 'int':
+        literal = '%d' % int(value)
+    elif ctype == 'char':
+        literal = "'%s'" % value
+    else:
+        literal = '"%s"' % value
+    return '-D%s=%s' % (name, literal)
+
+def default_params():
+    """
+    Reads the default values of the parameters from param.h
+
+    Returns:
+        dictionary of parameters, e.g. {'N': 5100, 'DR': 0.6, ...}
+    """
+    params = {}
+    with open(os.path.join(CODE_DIR, 'param.h')) as f:
+        for line in f:
+            match = re.match(r'#define\s+(\w+)\s+("[^"]*"|\'.\'|\S+)', line)
+            if match is None or match.group(1) not in PARAM_TYPES:
+                continue
+            name, literal = match.groups()
+            ctype = PARAM_TYPES[name]
+            if ctype == 'L':
+                params[name] = float(literal.rstrip('L'))
+            elif ctype in ('UL', 'int'):
+                params[name] = int(literal.rstrip('UL'))
+            else:
+                params[name] = literal[1:-1]
+    return params
+
+def compile_solver(binary, params, mode='fast', backend='cn'):
+    """
+    Compiles the simulation
+
+    Args:
+        binary: file name of the executable
+        params: dictionary of parameters overriding those in param.h
+        mode: 'fast' or 'safe' (compiler flags as in run.sh)
+        backend: 'cn' (Crank-Nicolson, sne.c) or 'spectral' (ssfm.c)
+    """
+    command = (['gcc'] + MODE_FLAGS[mode]
+               + [param_define(k, v) for k, v in sorted(params.items())]
+               + ['-o', os.path.abspath(binary), BACKENDS[backend]] + SOURCES
+               + ['-lm'])
+    subprocess.check_call(command, cwd=CODE_DIR)
+
+def run_solver(binary, args, log=None, stdin=''):
+    """
+    Runs the compiled simulation
+
+    Args:
+        binary: file name of the executable
+        args: list of command line arguments, e.g. ['s']
+        log: file name for the output of the simulation (default: discard)
+        stdin: input passed to the simulation (default: empty)
+
+    Returns:
+        exit status of the simulation
+    """
+    if log is None:
+        log = os.devnull
+    with open(log, 'a') as out:
+        proc = subprocess.run([os.path.abspath(binary)] + list(args),
+                              stdout=out, stderr=subprocess.STDOUT,
+                              input=stdin, universal_newlines=True)
+    return proc.returncode
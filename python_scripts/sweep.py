@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Schroedinger Newton Inhibitions of Dispersion
+# (C) Copyright Andre Grossardt 2010-2023
+# https://github.com/grossardt/schroedinger-newton-inhibitions-of-dispersion
+#
+# This code is licensed under the MIT License (see LICENSE.txt for details)
+
+"""
+This script runs the simulation for a grid of parameters on a pool of
+parallel processes. Each run is written to the subdirectory named after its
+parameters in the output directory, and the state of every job is kept in
+sweep.json there. A sweep that was interrupted is resumed by calling the
+script again: finished runs are skipped, and partial runs are continued
+from their last completely saved time step (continue mode 'c path time' of
+the simulation).
+
+The sweep is described by a JSON file, e.g.
+
+    {"outdir": "/data/sweep1",
+     "params": {"N": 2000, "DR": 1.0, "MAXT": 100000, "SAVEEVERY": 1000},
+     "grid": {"M": [1e9, 5e9, 1e10], "COUP": [0, 1], "WAVEFUNCT": ["g"]},
+     "backend": "cn", "mode": "fast"}
+
+with
+    outdir: output directory of the sweep
+    params: parameters of param.h that are the same for all runs (optional)
+    grid: lists of values of the parameters that are varied, e.g. M, W, DR,
+          DT, COUP, WAVEFUNCT; every combination is run
+    backend: integrator, 'cn' (sne.c, default) or 'spectral' (ssfm.c)
+    mode: compiler mode, 'fast' (default) or 'safe' as in run.sh
+
+Called with the following arguments:
+
+sweep.py run sweepfile [workers]
+
+    sweepfile: JSON file describing the sweep
+    workers: number of parallel runs (default: number of CPUs)
+
+sweep.py status sweepfile
+
+    prints the state of all runs of the sweep
+"""
+
+import sys
+import os
+import json
+import time
+import shutil
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from helpers import last_saved
+from solver import compile_solver, run_solver, default_params
+
+STATE_FILE = 'sweep.json'
+
+
+def format_value(v):
+    """
+    Returns a parameter value as used in run names, '%g' if that is exact
+    and repr otherwise, so that different values give different names
+    """
+    if not isinstance(v, (int, float)):
+        return str(v)
+    if float('%g' % v) == v:
+        return '%g' % v
+    return repr(v)
+
+def job_name(values):
+    """
+    Returns the name of a run, e.g. 'COUP1_M5e+09'
+
+    Args:
+        values: dictionary of the varied parameters of the run
+    """
+    return '_'.join('%s%s' % (k, format_value(v))
+                    for k, v in sorted(values.items()))
+
+def expand_grid(grid):
+    """
+    Returns a list of jobs {'name': ..., 'params': ...} for all combinations
+    of the values of the parameter grid
+    """
+    names = sorted(grid)
+    jobs = []
+    for combination in itertools.product(*[grid[k] for k in names]):
+        values = dict(zip(names, combination))
+        name = job_name(values)
+        if name in [job['name'] for job in jobs]:
+            print('Error: Duplicate run %s in the parameter grid' % name)
+            exit()
+        jobs.append({'name': name, 'params': values})
+    return jobs
+
+def load_state(outdir, state_file=STATE_FILE):
+    """
+    Returns the state of all jobs in the output directory (empty if new)
+    """
+    filename = os.path.join(outdir, state_file)
+    if not os.path.exists(filename):
+        return {}
+    with open(filename) as f:
+        return json.load(f)
+
+def save_state(outdir, state, state_file=STATE_FILE):
+    """
+    Writes the state of all jobs, replacing the old file only when the new
+    one is complete
+    """
+    filename = os.path.join(outdir, state_file)
+    with open(filename + '.tmp', 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(filename + '.tmp', filename)
+
+def truncate_run(path, t):
+    """
+    Removes all entries after time step t from times.dat and norm.dat of
+    a run that is continued from t
+    """
+    for name in 'times.dat', 'norm.dat':
+        filename = os.path.join(path, name)
+        if not os.path.exists(filename):
+            continue
+        with open(filename) as f:
+            lines = [l for l in f if l.strip() and
+                     len(l.split()) > 1 and int(l.split()[0]) <= t]
+        with open(filename, 'w') as f:
+            f.writelines(lines)
+
+def job_done(outdir, name, job_state):
+    """
+    Checks if a job is done and its last saved time step is still on disk
+    """
+    t = job_state.get('t')
+    return job_state['state'] == 'done' and t is not None and \
+        os.path.exists(os.path.join(outdir, name, 'data', 'w%014d.dat' % t))
+
+def run_job(outdir, job, backend, mode, wall=0.):
+    """
+    Runs or continues one job of a sweep
+
+    Args:
+        outdir: output directory of the sweep
+        job: dictionary with name, params (all parameters of the run) and
+             start (optional, arguments of the simulation for a new run,
+             default ['s', name])
+        backend: integrator backend ('cn' or 'spectral')
+        mode: compiler mode ('fast' or 'safe')
+        wall: wall time of earlier segments of the run in s
+
+    Returns:
+        dictionary with state ('done' or 'failed'), last saved time step
+        t, return code and wall time of the simulation (all segments)
+    """
+    name = job['name']
+    params = dict(default_params(), **job['params'])
+    params['OUTDIR'] = outdir
+    path = os.path.join(outdir, name)
+    t = last_saved(path, params['N'])
+    if t is not None and t >= params['MAXT']:
+        return {'state': 'done', 't': t, 'returncode': 0, 'wall': wall}
+    if t is None:
+        # nothing usable was saved, the run starts again
+        wall = 0.
+        if os.path.exists(path):
+            shutil.rmtree(path)
+    for subdir in 'bin', 'logs':
+        if not os.path.exists(os.path.join(outdir, subdir)):
+            os.makedirs(os.path.join(outdir, subdir), exist_ok=True)
+    binary = os.path.join(outdir, 'bin', name)
+    compile_solver(binary, params, mode, backend)
+    if t is None:
+        args = job.get('start', ['s', name])
+    else:
+        truncate_run(path, t)
+        args = ['c', name, str(t)]
+    start = time.perf_counter()
+    # newline for the confirmation asked in continue mode
+    returncode = run_solver(binary, args,
+                            os.path.join(outdir, 'logs', name + '.log'), '\n')
+    wall += time.perf_counter() - start
+    os.remove(binary)
+    # the simulation exits with status 0 on errors, so check the results
+    t = last_saved(path, params['N'])
+    state = 'done' if t is not None and t >= params['MAXT'] else 'failed'
+    return {'state': state, 't': t, 'returncode': returncode, 'wall': wall}
+
+def run_jobs(outdir, jobs, workers=None, backend='cn', mode='fast',
+             state_file=STATE_FILE):
+    """
+    Runs all jobs that are not done on a pool of workers and keeps track
+    of their state in state_file in the output directory
+
+    Args:
+        outdir: output directory
+        jobs: list of jobs, see run_job
+        workers: number of parallel runs (default: number of CPUs)
+        backend: integrator backend ('cn' or 'spectral')
+        mode: compiler mode ('fast' or 'safe')
+        state_file: name of the file keeping the state of the jobs
+
+    Returns:
+        dictionary of the state of all jobs
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not os.path.exists(outdir):
+        os.makedirs(outdir)
+    state = load_state(outdir, state_file)
+    for job in jobs:
+        old = state.get(job['name'])
+        if old is not None and old['params'] != job['params']:
+            print('Error: Parameters of %s differ from the earlier run'
+                  % job['name'])
+            exit()
+        if old is None:
+            state[job['name']] = {'params': job['params'], 'state': 'pending'}
+    save_state(outdir, state, state_file)
+    lock = threading.Lock()
+
+    def work(job):
+        with lock:
+            state[job['name']]['state'] = 'running'
+            save_state(outdir, state, state_file)
+        try:
+            result = run_job(outdir, job, backend, mode,
+                             state[job['name']].get('wall', 0.))
+        except Exception as e:
+            result = {'state': 'failed', 'error': str(e)}
+        with lock:
+            state[job['name']].update(result)
+            save_state(outdir, state, state_file)
+        print('%-40s %s' % (job['name'], result['state']))
+
+    todo = [job for job in jobs
+            if not job_done(outdir, job['name'], state[job['name']])]
+    print('%d of %d runs to do on %d workers'
+          % (len(todo), len(jobs), workers))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(work, todo))
+    return state
+
+def print_status(state):
+    """
+    Prints the state of all jobs
+    """
+    print('%-40s %-8s %14s %10s' % ('run', 'state', 'last saved', 'wall (s)'))
+    for name in sorted(state):
+        job = state[name]
+        print('%-40s %-8s %14s %10.1f'
+              % (name, job['state'], job.get('t'), job.get('wall', 0.)))
+
+
+if __name__ == "__main__":
+    # arguments: run, sweepfile, [workers] or status, sweepfile
+    if len(sys.argv) < 3 or sys.argv[1] not in ('run', 'status'):
+        print('need arguments: run, sweepfile, [workers]')
+        print('or: status, sweepfile')
+        exit()
+    with open(sys.argv[2]) as f:
+        sweep = json.load(f)
+    outdir = os.path.abspath(sweep['outdir'])
+
+    if sys.argv[1] == 'status':
+        print_status(load_state(outdir))
+        exit()
+
+    workers = None
+    if len(sys.argv) > 3:
+        workers = int(sys.argv[3])
+    jobs = expand_grid(sweep['grid'])
+    for job in jobs:
+        job['params'] = dict(sweep.get('params', {}), **job['params'])
+    state = run_jobs(outdir, jobs, workers, sweep.get('backend', 'cn'),
+                     sweep.get('mode', 'fast'))
+    failed = [name for name in state if state[name]['state'] != 'done']
+    if failed:
+        print('Failed runs: %s' % ', '.join(sorted(failed)))
+        sys.exit(1)
+    print('All runs done.')